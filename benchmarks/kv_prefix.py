@@ -0,0 +1,78 @@
+"""
+Copyright (C) 2025  Brenno Flávio de Almeida
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; version 3.
+
+picpocket is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+# Prefix queries on a large kv.db: the key range scans used by KV against
+# the LIKE filter they replaced.
+#
+#     python benchmarks/kv_prefix.py [unrelated keys]
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["XDG_CONFIG_HOME"] = tempfile.mkdtemp()
+
+from src.ut_components import setup  # noqa: E402
+
+setup("picpocket.benchmark")
+
+from src.ut_components.kv import KV  # noqa: E402
+
+CLEAR_CACHE_PREFIXES = ["photo", "album", "memory", "memoize", "favorite", "archived", "deleted", "person"]
+
+
+def timed(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(unrelated: int) -> None:
+    with KV() as kv:
+        for i in range(unrelated):
+            kv.put_cached(f"timeline.{i:08d}.next", "abcdef")
+            if i % 30000 == 0:
+                kv.commit_cached()
+        for i in range(200):
+            kv.put_cached(f"album.x.{i}.next", "abc")
+        kv.commit_cached()
+
+        def like_get() -> None:
+            kv.conn.execute("SELECT key, value FROM kv WHERE key LIKE ? || '%'", ("album.x.",)).fetchall()
+
+        def like_delete() -> None:
+            for prefix in CLEAR_CACHE_PREFIXES:
+                kv.conn.execute("DELETE FROM kv WHERE key LIKE ? || '%'", (prefix + ".missing",))
+            kv.conn.commit()
+
+        def range_delete() -> None:
+            for prefix in CLEAR_CACHE_PREFIXES:
+                kv.delete_partial(prefix + ".missing")
+
+        assert len(kv.get_partial("album.x.")) == 200
+        print(f"{unrelated} unrelated keys, 200 matching keys")
+        like, ranged = timed(like_get, 20), timed(lambda: kv.get_partial("album.x."), 20)
+        print(f"get_partial, 200 hits:     LIKE {like:8.2f} ms  range {ranged:6.2f} ms")
+        like, ranged = timed(like_delete, 5), timed(range_delete, 5)
+        print(f"8 delete_partial, no hits: LIKE {like:8.2f} ms  range {ranged:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500000)
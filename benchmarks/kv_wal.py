@@ -0,0 +1,99 @@
+"""
+Copyright (C) 2025  Brenno Flávio de Almeida
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; version 3.
+
+picpocket is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+# Concurrent kv.db throughput, WAL with synchronous=NORMAL against the
+# rollback journal with synchronous=FULL used before.
+#
+#     python benchmarks/kv_wal.py [seconds]
+
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+KEYS = 2000
+READERS = 4
+
+
+def run(mode: str, seconds: float) -> None:
+    os.environ["XDG_CONFIG_HOME"] = tempfile.mkdtemp()
+
+    from src.ut_components import setup
+
+    setup("picpocket.benchmark")
+
+    from src.ut_components.kv import KV, get_connection, set_pragmas
+
+    if mode == "rollback":
+        get_connection().execute("PRAGMA journal_mode = DELETE")
+        set_pragmas(synchronous="FULL")
+
+    with KV() as kv:
+        for i in range(KEYS):
+            kv.put_cached(f"asset.{i}.name", f"IMG_{i}.jpg", ttl_seconds=300)
+        kv.commit_cached()
+
+    stop = threading.Event()
+    counts = {"get": 0, "write": 0}
+    lock = threading.Lock()
+
+    def reader() -> None:
+        n = 0
+        while not stop.is_set():
+            with KV() as kv:
+                kv.get(f"asset.{n % KEYS}.name")
+            n += 1
+        with lock:
+            counts["get"] += n
+
+    def writer() -> None:
+        n = 0
+        while not stop.is_set():
+            with KV() as kv:
+                for j in range(20):
+                    kv.put_cached(f"sequence.{n}.{j}", "x")
+                kv.commit_cached()
+                kv.put(f"memoize.{n}", {"n": n}, ttl_seconds=300)
+            n += 1
+        with lock:
+            counts["write"] += n
+
+    threads = [threading.Thread(target=reader) for _ in range(READERS)] + [threading.Thread(target=writer)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    journal = get_connection().execute("PRAGMA journal_mode").fetchone()[0]
+    print(
+        f"{mode:8} ({journal}): {counts['get'] / seconds:8.0f} gets/s {counts['write'] / seconds:6.0f} write batches/s"
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        run(sys.argv[2], float(sys.argv[1]))
+    else:
+        seconds = sys.argv[1] if len(sys.argv) > 1 else "3"
+        print(f"{READERS} readers doing get(), 1 writer doing a 20-row commit_cached() and a put(), {seconds}s")
+        for mode in ("rollback", "wal"):
+            subprocess.run([sys.executable, __file__, seconds, mode], check=True)
@@ -24,6 +24,8 @@ import "ut_components"
 Page {
     id: albumDetailPage
 
+    property string downloadGroup: 'album.' + albumId
+
     property string albumId: ""
     property string albumName: ""
     property var selectedImages: []
@@ -73,6 +75,11 @@ Page {
         id: python
 
         Component.onCompleted: {
+            setHandler('thumbnails-ready', function (event) {
+                    if (event.group === albumDetailPage.downloadGroup) {
+                        gallery.thumbnailsReady(event.images);
+                    }
+                });
             addImportPath(Qt.resolvedUrl('../src/'));
             importModule('immich_client', function () {
                     loadAlbumTimeline("");
@@ -105,6 +112,10 @@ Page {
                 });
         }
 
+        onThumbnailsNeeded: function (visibleIds, prefetchIds) {
+            python.call('immich_client.fetch_thumbnails', [albumDetailPage.downloadGroup, visibleIds, prefetchIds]);
+        }
+
         onSelectionModeExited: {
             albumDetailPage.selectedImages = [];
         }
@@ -132,9 +143,7 @@ Page {
                 loadingToast.showing = true;
                 loadingToast.message = i18n.tr("Deleting album...");
                 python.call('immich_client.delete_album', [albumId], function (result) {
-                        python.call('immich_client.clear_cache', [], function () {
-                                pageStack.pop();
-                            });
+                        pageStack.pop();
                     });
             }
         }
@@ -169,9 +178,7 @@ Page {
                 }
                 python.call('immich_client.delete_assets_to_album', [albumId, imageIds], function (result) {
                         gallery.exitSelectionMode();
-                        python.call('immich_client.clear_cache', [], function () {
-                                loadAlbumTimeline("");
-                            });
+                        loadAlbumTimeline("");
                     });
             }
         }
@@ -193,9 +200,7 @@ Page {
                 }
                 python.call('immich_client.archive', imageIds, function (result) {
                         gallery.exitSelectionMode();
-                        python.call('immich_client.clear_cache', [], function () {
-                                loadAlbumTimeline("");
-                            });
+                        loadAlbumTimeline("");
                     });
             }
         }
@@ -217,9 +222,7 @@ Page {
                 }
                 python.call('immich_client.delete', imageIds, function (result) {
                         gallery.exitSelectionMode();
-                        python.call('immich_client.clear_cache', [], function () {
-                                loadAlbumTimeline("");
-                            });
+                        loadAlbumTimeline("");
                     });
             }
         }
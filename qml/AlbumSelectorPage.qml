@@ -103,10 +103,8 @@ Page {
         onItemClicked: {
             addingToAlbum = true;
             python.call('immich_client.add_assets_to_album', [item.id, selectedAssetIds], function (result) {
-                    python.call('immich_client.clear_cache', [], function () {
-                            addingToAlbum = false;
-                            pageStack.pop();
-                        });
+                    addingToAlbum = false;
+                    pageStack.pop();
                 });
         }
     }
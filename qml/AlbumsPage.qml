@@ -94,9 +94,7 @@ Page {
                     var albumName = albumNameInput.text.trim();
                     PopupUtils.close(dialogue);
                     python.call('immich_client.add_album', [albumName], function (result) {
-                            python.call('immich_client.clear_cache', [], function () {
-                                    loadAlbums();
-                                });
+                            loadAlbums();
                         });
                 }
             }
@@ -23,6 +23,8 @@ import "ut_components"
 Page {
     id: archivedPage
 
+    property string downloadGroup: 'archived'
+
     header: AppHeader {
         id: header
         pageTitle: i18n.tr('Archived')
@@ -39,11 +41,13 @@ Page {
         })
 
     property var selectedImages: []
+    property string currentBucket: ""
 
     function loadTimeline(hint) {
         loadingToast.showing = true;
         loadingToast.message = i18n.tr("Loading archived photos...");
         var args = hint ? [hint] : [""];
+        archivedPage.currentBucket = args[0];
         python.call('immich_client.archived_timeline', args, function (result) {
                 archivedPage.galleryData = result;
                 loadingToast.showing = false;
@@ -54,6 +58,18 @@ Page {
         id: python
 
         Component.onCompleted: {
+            setHandler('memoize-refreshed', function (event) {
+                    if (event.function === 'base_timeline' && event.args[0] === 'archived' && event.args[1] === archivedPage.currentBucket) {
+                        python.call('immich_client.archived_timeline', [archivedPage.currentBucket], function (result) {
+                                archivedPage.galleryData = result;
+                            });
+                    }
+                });
+            setHandler('thumbnails-ready', function (event) {
+                    if (event.group === archivedPage.downloadGroup) {
+                        gallery.thumbnailsReady(event.images);
+                    }
+                });
             addImportPath(Qt.resolvedUrl('../src/'));
             importModule('immich_client', function () {
                     loadTimeline("");
@@ -80,10 +96,15 @@ Page {
             pageStack.push(Qt.resolvedUrl("PhotoDetail.qml"), {
                     "previewType": "archived",
                     "filePath": imageData.filePath,
-                    "photoId": imageData.id || ""
+                    "photoId": imageData.id || "",
+                    "sequencePage": archivedPage.galleryData.page || ""
                 });
         }
 
+        onThumbnailsNeeded: function (visibleIds, prefetchIds) {
+            python.call('immich_client.fetch_thumbnails', [archivedPage.downloadGroup, visibleIds, prefetchIds]);
+        }
+
         onSelectionModeExited: {
             archivedPage.selectedImages = [];
         }
@@ -157,9 +178,7 @@ Page {
                 }
                 python.call('immich_client.unarchive', imageIds, function (result) {
                         gallery.exitSelectionMode();
-                        python.call('immich_client.clear_cache', [], function () {
-                                loadTimeline("");
-                            });
+                        loadTimeline("");
                     });
             }
         }
@@ -181,9 +200,7 @@ Page {
                 }
                 python.call('immich_client.delete', imageIds, function (result) {
                         gallery.exitSelectionMode();
-                        python.call('immich_client.clear_cache', [], function () {
-                                loadTimeline("");
-                            });
+                        loadTimeline("");
                     });
             }
         }
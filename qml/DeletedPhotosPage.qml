@@ -23,6 +23,8 @@ import "ut_components"
 Page {
     id: deletedPhotosPage
 
+    property string downloadGroup: 'deleted'
+
     header: AppHeader {
         id: header
         pageTitle: i18n.tr('Deleted Photos')
@@ -39,11 +41,13 @@ Page {
         })
 
     property var selectedImages: []
+    property string currentBucket: ""
 
     function loadTimeline(hint) {
         loadingToast.showing = true;
         loadingToast.message = i18n.tr("Loading deleted photos...");
         var args = hint ? [hint] : [""];
+        deletedPhotosPage.currentBucket = args[0];
         python.call('immich_client.deleted_timeline', args, function (result) {
                 deletedPhotosPage.galleryData = result;
                 loadingToast.showing = false;
@@ -54,6 +58,18 @@ Page {
         id: python
 
         Component.onCompleted: {
+            setHandler('memoize-refreshed', function (event) {
+                    if (event.function === 'base_timeline' && event.args[0] === 'deleted' && event.args[1] === deletedPhotosPage.currentBucket) {
+                        python.call('immich_client.deleted_timeline', [deletedPhotosPage.currentBucket], function (result) {
+                                deletedPhotosPage.galleryData = result;
+                            });
+                    }
+                });
+            setHandler('thumbnails-ready', function (event) {
+                    if (event.group === deletedPhotosPage.downloadGroup) {
+                        gallery.thumbnailsReady(event.images);
+                    }
+                });
             addImportPath(Qt.resolvedUrl('../src/'));
             importModule('immich_client', function () {
                     loadTimeline("");
@@ -80,10 +96,15 @@ Page {
             pageStack.push(Qt.resolvedUrl("PhotoDetail.qml"), {
                     "previewType": "deleted",
                     "filePath": imageData.filePath,
-                    "photoId": imageData.id || ""
+                    "photoId": imageData.id || "",
+                    "sequencePage": deletedPhotosPage.galleryData.page || ""
                 });
         }
 
+        onThumbnailsNeeded: function (visibleIds, prefetchIds) {
+            python.call('immich_client.fetch_thumbnails', [deletedPhotosPage.downloadGroup, visibleIds, prefetchIds]);
+        }
+
         onSelectionModeExited: {
             deletedPhotosPage.selectedImages = [];
         }
@@ -157,9 +178,7 @@ Page {
                 }
                 python.call('immich_client.undelete', imageIds, function (result) {
                         gallery.exitSelectionMode();
-                        python.call('immich_client.clear_cache', [], function () {
-                                loadTimeline("");
-                            });
+                        loadTimeline("");
                     });
             }
         }
@@ -181,9 +200,7 @@ Page {
                 }
                 python.call('immich_client.permanently_delete', imageIds, function (result) {
                         gallery.exitSelectionMode();
-                        python.call('immich_client.clear_cache', [], function () {
-                                loadTimeline("");
-                            });
+                        loadTimeline("");
                     });
             }
         }
@@ -23,6 +23,8 @@ import "ut_components"
 Page {
     id: favoritesPage
 
+    property string downloadGroup: 'favorite'
+
     property var selectedImages: []
 
     header: AppHeader {
@@ -39,11 +41,13 @@ Page {
             "previous": "",
             "next": ""
         })
+    property string currentBucket: ""
 
     function loadTimeline(hint) {
         loadingToast.showing = true;
         loadingToast.message = i18n.tr("Loading favorites...");
         var args = hint ? [hint] : [""];
+        favoritesPage.currentBucket = args[0];
         python.call('immich_client.favorite_timeline', args, function (result) {
                 favoritesPage.galleryData = result;
                 loadingToast.showing = false;
@@ -54,6 +58,18 @@ Page {
         id: python
 
         Component.onCompleted: {
+            setHandler('memoize-refreshed', function (event) {
+                    if (event.function === 'base_timeline' && event.args[0] === 'favorite' && event.args[1] === favoritesPage.currentBucket) {
+                        python.call('immich_client.favorite_timeline', [favoritesPage.currentBucket], function (result) {
+                                favoritesPage.galleryData = result;
+                            });
+                    }
+                });
+            setHandler('thumbnails-ready', function (event) {
+                    if (event.group === favoritesPage.downloadGroup) {
+                        gallery.thumbnailsReady(event.images);
+                    }
+                });
             addImportPath(Qt.resolvedUrl('../src/'));
             importModule('immich_client', function () {
                     loadTimeline("");
@@ -80,10 +96,15 @@ Page {
             pageStack.push(Qt.resolvedUrl("PhotoDetail.qml"), {
                     "previewType": "favorite",
                     "filePath": imageData.filePath,
-                    "photoId": imageData.id || ""
+                    "photoId": imageData.id || "",
+                    "sequencePage": favoritesPage.galleryData.page || ""
                 });
         }
 
+        onThumbnailsNeeded: function (visibleIds, prefetchIds) {
+            python.call('immich_client.fetch_thumbnails', [favoritesPage.downloadGroup, visibleIds, prefetchIds]);
+        }
+
         onSelectionModeExited: {
             favoritesPage.selectedImages = [];
         }
@@ -176,9 +197,7 @@ Page {
                 }
                 python.call('immich_client.archive', imageIds, function (result) {
                         gallery.exitSelectionMode();
-                        python.call('immich_client.clear_cache', [], function () {
-                                loadTimeline("");
-                            });
+                        loadTimeline("");
                     });
             }
         }
@@ -200,9 +219,7 @@ Page {
                 }
                 python.call('immich_client.delete', imageIds, function (result) {
                         gallery.exitSelectionMode();
-                        python.call('immich_client.clear_cache', [], function () {
-                                loadTimeline("");
-                            });
+                        loadTimeline("");
                     });
             }
         }
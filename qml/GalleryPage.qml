@@ -25,6 +25,8 @@ import "ut_components"
 Page {
     id: galleryPage
 
+    property string downloadGroup: 'timeline'
+
     header: AppHeader {
         id: header
         pageTitle: i18n.tr('PicPocket')
@@ -45,25 +47,29 @@ Page {
 
     property var memoriesData: []
     property var selectedImages: []
+    property string currentBucket: ""
+
+    function setMemories(memoriesResult) {
+        if (memoriesResult && memoriesResult.memories) {
+            // Convert thumbnail_url to thumbnailUrl for QML
+            galleryPage.memoriesData = memoriesResult.memories.map(function (memory) {
+                    return {
+                        "title": memory.title,
+                        "thumbnailUrl": memory.thumbnail_url || "",
+                        "id": memory.first_image_id || ""
+                    };
+                });
+        }
+    }
 
     function loadTimeline(hint) {
         loadingToast.showing = true;
         loadingToast.message = i18n.tr("Loading photos...");
         var args = hint ? [hint] : [""];
+        galleryPage.currentBucket = args[0];
 
         // Load memories
-        python.call('immich_client.memories', [], function (memoriesResult) {
-                if (memoriesResult && memoriesResult.memories) {
-                    // Convert thumbnail_url to thumbnailUrl for QML
-                    galleryPage.memoriesData = memoriesResult.memories.map(function (memory) {
-                            return {
-                                "title": memory.title,
-                                "thumbnailUrl": memory.thumbnail_url || "",
-                                "id": memory.first_image_id || ""
-                            };
-                        });
-                }
-            });
+        python.call('immich_client.memories', [], setMemories);
 
         // Load timeline
         python.call('immich_client.timeline', args, function (result) {
@@ -76,6 +82,20 @@ Page {
         id: python
 
         Component.onCompleted: {
+            setHandler('memoize-refreshed', function (event) {
+                    if (event.function === 'memories') {
+                        setMemories(event.result);
+                    } else if (event.function === 'base_timeline' && event.args[0] === 'timeline' && event.args[1] === galleryPage.currentBucket) {
+                        python.call('immich_client.timeline', [galleryPage.currentBucket], function (result) {
+                                galleryPage.galleryData = result;
+                            });
+                    }
+                });
+            setHandler('thumbnails-ready', function (event) {
+                    if (event.group === galleryPage.downloadGroup) {
+                        gallery.thumbnailsReady(event.images);
+                    }
+                });
             addImportPath(Qt.resolvedUrl('../src/'));
             importModule('immich_client', function () {
                     loadTimeline("");
@@ -102,7 +122,8 @@ Page {
             pageStack.push(Qt.resolvedUrl("PhotoDetail.qml"), {
                     "previewType": "memory",
                     "filePath": memoryData.thumbnailUrl || "",
-                    "photoId": memoryData.id || ""
+                    "photoId": memoryData.id || "",
+                    "sequencePage": memoryData.id || ""
                 });
         }
     }
@@ -122,10 +143,15 @@ Page {
             pageStack.push(Qt.resolvedUrl("PhotoDetail.qml"), {
                     "previewType": "timeline",
                     "filePath": imageData.filePath,
-                    "photoId": imageData.id || ""
+                    "photoId": imageData.id || "",
+                    "sequencePage": galleryPage.galleryData.page || ""
                 });
         }
 
+        onThumbnailsNeeded: function (visibleIds, prefetchIds) {
+            python.call('immich_client.fetch_thumbnails', [galleryPage.downloadGroup, visibleIds, prefetchIds]);
+        }
+
         onSelectionModeExited: {
             galleryPage.selectedImages = [];
         }
@@ -251,9 +277,7 @@ Page {
                 }
                 python.call('immich_client.archive', imageIds, function (result) {
                         gallery.exitSelectionMode();
-                        python.call('immich_client.clear_cache', [], function () {
-                                loadTimeline("");
-                            });
+                        loadTimeline("");
                     });
             }
         }
@@ -275,9 +299,7 @@ Page {
                 }
                 python.call('immich_client.delete', imageIds, function (result) {
                         gallery.exitSelectionMode();
-                        python.call('immich_client.clear_cache', [], function () {
-                                loadTimeline("");
-                            });
+                        loadTimeline("");
                     });
             }
         }
@@ -331,9 +353,7 @@ Page {
                                 "text": dialogMessage
                             });
                         if (result.success) {
-                            python.call('immich_client.clear_cache', [], function () {
-                                    loadTimeline("");
-                                });
+                            loadTimeline("");
                         }
                         filesToUpload = [];
                     });
@@ -8,6 +8,8 @@ import "ut_components"
 Page {
     id: locationDetailPage
 
+    property string downloadGroup: 'location.' + locationId
+
     property string locationId: ""
     property string locationName: ""
     property var selectedImages: []
@@ -85,7 +87,8 @@ Page {
                     "previewType": "location",
                     "locationId": locationDetailPage.locationId,
                     "filePath": imageData.filePath,
-                    "photoId": imageData.id || ""
+                    "photoId": imageData.id || "",
+                    "sequencePage": locationDetailPage.locationPhotosData.page || ""
                 });
         }
 
@@ -155,9 +158,7 @@ Page {
                 }
                 python.call('immich_client.archive', imageIds, function (result) {
                         gallery.exitSelectionMode();
-                        python.call('immich_client.clear_cache', [], function () {
-                                loadLocationDetail("");
-                            });
+                        loadLocationDetail("");
                     });
             }
         }
@@ -179,9 +180,7 @@ Page {
                 }
                 python.call('immich_client.delete', imageIds, function (result) {
                         gallery.exitSelectionMode();
-                        python.call('immich_client.clear_cache', [], function () {
-                                loadLocationDetail("");
-                            });
+                        loadLocationDetail("");
                     });
             }
         }
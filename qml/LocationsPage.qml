@@ -7,6 +7,8 @@ import "ut_components"
 Page {
     id: locationsPage
 
+    property string downloadGroup: 'locations'
+
     header: AppHeader {
         title: i18n.tr("Locations")
         showSettingsButton: true
@@ -34,9 +34,28 @@ MainView {
         id: pageStack
         anchors.fill: parent
 
+        // Download groups of the pages in the stack, bottom first
+        property var downloadGroups: []
+
         Component.onCompleted: {
             pageStack.push(loginPage);
         }
+
+        onDepthChanged: {
+            // Pages above the new depth were popped: drop their queued downloads
+            while (downloadGroups.length > depth) {
+                var group = downloadGroups.pop();
+                if (group) {
+                    python.call('immich_client.cancel_downloads', [group]);
+                }
+            }
+        }
+
+        onCurrentPageChanged: {
+            if (depth > 0) {
+                downloadGroups[depth - 1] = currentPage && currentPage.downloadGroup ? currentPage.downloadGroup : "";
+            }
+        }
     }
 
     Component {
@@ -165,6 +184,7 @@ MainView {
         Component.onCompleted: {
             addImportPath(Qt.resolvedUrl('../src/'));
             importModule('immich_client', function () {
+                    python.call('immich_client.start_event_loop', []);
                     python.call('immich_client.should_login', [], function (shouldLogin) {
                             if (shouldLogin === false) {
                                 pageStack.clear();
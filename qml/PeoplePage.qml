@@ -7,6 +7,8 @@ import "ut_components"
 Page {
     id: peoplePage
 
+    property string downloadGroup: 'people'
+
     header: AppHeader {
         title: i18n.tr("People")
         showSettingsButton: true
@@ -22,6 +24,11 @@ Page {
         id: python
 
         Component.onCompleted: {
+            setHandler('memoize-refreshed', function (event) {
+                    if (event.function === 'people') {
+                        setPeople(event.result);
+                    }
+                });
             addImportPath(Qt.resolvedUrl('../src/'));
             importModule('immich_client', function () {
                     loadPeople();
@@ -37,20 +44,24 @@ Page {
         loadingToast.showing = true;
         loadingToast.message = i18n.tr("Loading people...");
         python.call('immich_client.people', [], function (result) {
-                if (result) {
-                    peopleData = result.people.map(function (person) {
-                            return {
-                                "id": person.id,
-                                "title": person.name ? person.name : i18n.tr("No name"),
-                                "subtitle": "",
-                                "thumbnailSource": person.face_path
-                            };
-                        });
-                }
+                setPeople(result);
                 loadingToast.showing = false;
             });
     }
 
+    function setPeople(result) {
+        if (result) {
+            peopleData = result.people.map(function (person) {
+                    return {
+                        "id": person.id,
+                        "title": person.name ? person.name : i18n.tr("No name"),
+                        "subtitle": "",
+                        "thumbnailSource": person.face_path
+                    };
+                });
+        }
+    }
+
     CardList {
         id: cardList
         anchors {
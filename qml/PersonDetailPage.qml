@@ -8,6 +8,8 @@ import "ut_components"
 Page {
     id: personDetailPage
 
+    property string downloadGroup: 'person.' + personId
+
     property string personId: ""
     property string personName: ""
     property var selectedImages: []
@@ -28,6 +30,7 @@ Page {
             "previous": "",
             "next": ""
         })
+    property string currentBucket: ""
 
     function loadPersonTimeline(hint) {
         loadingToast.showing = true;
@@ -38,6 +41,7 @@ Page {
         } else {
             args = [personId];
         }
+        personDetailPage.currentBucket = hint || "";
         python.call('immich_client.person_timeline', args, function (result) {
                 if (result) {
                     personDetailPage.personPhotosData = result;
@@ -57,6 +61,18 @@ Page {
         id: python
 
         Component.onCompleted: {
+            setHandler('memoize-refreshed', function (event) {
+                    if (event.function === 'base_timeline' && event.args[0] === 'person.' + personId && event.args[1] === personDetailPage.currentBucket) {
+                        python.call('immich_client.person_timeline', personDetailPage.currentBucket ? [personId, personDetailPage.currentBucket] : [personId], function (result) {
+                                personDetailPage.personPhotosData = result;
+                            });
+                    }
+                });
+            setHandler('thumbnails-ready', function (event) {
+                    if (event.group === personDetailPage.downloadGroup) {
+                        gallery.thumbnailsReady(event.images);
+                    }
+                });
             addImportPath(Qt.resolvedUrl('../src/'));
             importModule('immich_client', function () {
                     loadPersonTimeline("");
@@ -85,10 +101,15 @@ Page {
                     "previewType": "person",
                     "personId": personDetailPage.personId,
                     "filePath": imageData.filePath,
-                    "photoId": imageData.id || ""
+                    "photoId": imageData.id || "",
+                    "sequencePage": personDetailPage.personPhotosData.page || ""
                 });
         }
 
+        onThumbnailsNeeded: function (visibleIds, prefetchIds) {
+            python.call('immich_client.fetch_thumbnails', [personDetailPage.downloadGroup, visibleIds, prefetchIds]);
+        }
+
         onSelectionModeExited: {
             personDetailPage.selectedImages = [];
         }
@@ -168,9 +189,7 @@ Page {
                 }
                 python.call('immich_client.archive', imageIds, function (result) {
                         gallery.exitSelectionMode();
-                        python.call('immich_client.clear_cache', [], function () {
-                                loadPersonTimeline("");
-                            });
+                        loadPersonTimeline("");
                     });
             }
         }
@@ -192,9 +211,7 @@ Page {
                 }
                 python.call('immich_client.delete', imageIds, function (result) {
                         gallery.exitSelectionMode();
-                        python.call('immich_client.clear_cache', [], function () {
-                                loadPersonTimeline("");
-                            });
+                        loadPersonTimeline("");
                     });
             }
         }
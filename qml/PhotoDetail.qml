@@ -25,6 +25,8 @@ import "ut_components"
 Page {
     id: photoDetailPage
 
+    property string downloadGroup: 'preview'
+
     property string filePath: ""
     property string photoId: ""
     property string photoName: ""
@@ -40,6 +42,7 @@ Page {
     property string personId: ""
     property string locationId: ""
     property string searchQuery: ""
+    property string sequencePage: ""
     property var currentMediaItem: photoDetailPage.filePath !== "" ? ({
         "filePath": photoDetailPage.filePath,
         "id": photoDetailPage.photoId,
@@ -68,7 +71,7 @@ Page {
     function loadPhotoDetails() {
         photoDetailPage.isLoading = true;
         photosViewedMetric.increment(1);
-        python.call('immich_client.preview', [photoId, previewType, albumId, personId, locationId, searchQuery], function(result) {
+        python.call('immich_client.preview', [photoId, previewType, albumId, personId, locationId, searchQuery, sequencePage], function(result) {
             if (result) {
                 photoDetailPage.setCurrentMedia(result.filePath || photoDetailPage.filePath, result.file_type || photoDetailPage.fileType, result.name || photoDetailPage.photoName);
                 photoDetailPage.previousId = result.previous || "";
@@ -228,10 +231,8 @@ Page {
             onClicked: {
                 var methodName = photoDetailPage.isArchived ? 'immich_client.unarchive' : 'immich_client.archive';
                 python.call(methodName, [photoDetailPage.photoId], function(result) {
-                    python.call('immich_client.clear_cache', [], function() {
-                        pageStack.clear();
-                        pageStack.push(Qt.resolvedUrl("GalleryPage.qml"));
-                    });
+                    pageStack.clear();
+                    pageStack.push(Qt.resolvedUrl("GalleryPage.qml"));
                 });
             }
         }
@@ -242,10 +243,8 @@ Page {
             visible: !photoDetailPage.isDeleted
             onClicked: {
                 python.call('immich_client.delete', [photoDetailPage.photoId], function(result) {
-                    python.call('immich_client.clear_cache', [], function() {
-                        pageStack.clear();
-                        pageStack.push(Qt.resolvedUrl("GalleryPage.qml"));
-                    });
+                    pageStack.clear();
+                    pageStack.push(Qt.resolvedUrl("GalleryPage.qml"));
                 });
             }
         }
@@ -256,10 +255,8 @@ Page {
             visible: photoDetailPage.isDeleted
             onClicked: {
                 python.call('immich_client.undelete', [photoDetailPage.photoId], function(result) {
-                    python.call('immich_client.clear_cache', [], function() {
-                        pageStack.clear();
-                        pageStack.push(Qt.resolvedUrl("GalleryPage.qml"));
-                    });
+                    pageStack.clear();
+                    pageStack.push(Qt.resolvedUrl("GalleryPage.qml"));
                 });
             }
         }
@@ -270,10 +267,8 @@ Page {
             visible: photoDetailPage.isDeleted
             onClicked: {
                 python.call('immich_client.permanently_delete', [photoDetailPage.photoId], function(result) {
-                    python.call('immich_client.clear_cache', [], function() {
-                        pageStack.clear();
-                        pageStack.push(Qt.resolvedUrl("GalleryPage.qml"));
-                    });
+                    pageStack.clear();
+                    pageStack.push(Qt.resolvedUrl("GalleryPage.qml"));
                 });
             }
         }
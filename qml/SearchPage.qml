@@ -23,6 +23,8 @@ import "ut_components"
 Page {
     id: searchPage
 
+    property string downloadGroup: 'search'
+
     header: AppHeader {
         id: header
         pageTitle: i18n.tr('Search')
@@ -122,6 +124,7 @@ Page {
                     "previewType": "search",
                     "filePath": imageData.filePath,
                     "photoId": imageData.id || "",
+                    "sequencePage": searchPage.galleryData.page || "",
                     "searchQuery": currentQuery
                 });
         }
@@ -239,9 +242,7 @@ Page {
                 }
                 python.call('immich_client.archive', imageIds, function (result) {
                         gallery.exitSelectionMode();
-                        python.call('immich_client.clear_cache', [], function () {
-                                performSearch(currentQuery, "");
-                            });
+                        performSearch(currentQuery, "");
                     });
             }
         }
@@ -263,9 +264,7 @@ Page {
                 }
                 python.call('immich_client.delete', imageIds, function (result) {
                         gallery.exitSelectionMode();
-                        python.call('immich_client.clear_cache', [], function () {
-                                performSearch(currentQuery, "");
-                            });
+                        performSearch(currentQuery, "");
                     });
             }
         }
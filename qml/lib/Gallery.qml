@@ -41,6 +41,29 @@ Item {
      */
     property var images: []
 
+    /*!
+     * Thumbnail paths by image id, for images that were shown before their
+     * thumbnail was downloaded. Filled by thumbnailsReady() and cleared when
+     * images changes.
+     */
+    property var readyThumbnails: ({})
+
+    /*!
+     * Failed download attempts by image id. Failed thumbnails are requested
+     * again after thumbnailRetryInterval, up to thumbnailRetries times, and
+     * then shown as missing.
+     */
+    property var failedThumbnails: ({})
+
+    /*! Number of times a failed thumbnail download is retried */
+    property int thumbnailRetries: 3
+
+    /*! Milliseconds to wait before retrying failed thumbnail downloads */
+    property int thumbnailRetryInterval: 2000
+
+    /*! Number of images around the visible ones whose thumbnails are requested ahead of time */
+    property int thumbnailPrefetch: 60
+
     /*! Size in pixels for each image cell in the grid. Auto-calculated based on width to fit 3 columns */
     property int cellSize: calculateCellSize()
 
@@ -85,6 +108,95 @@ Item {
      */
     signal selectionChanged(var selectedImages)
 
+    /*!
+     * Emitted after scrolling stops on images whose thumbnail is not loaded yet.
+     * @param visibleIds Ids of the images on screen without a thumbnail
+     * @param prefetchIds Ids of the images within thumbnailPrefetch of the screen without a thumbnail
+     */
+    signal thumbnailsNeeded(var visibleIds, var prefetchIds)
+
+    function requestVisibleThumbnails() {
+        if (images.length === 0)
+            return;
+        var columns = Math.max(1, Math.floor(gridView.width / gridView.cellWidth));
+        var first = Math.max(0, Math.floor(gridView.contentY / gridView.cellHeight) * columns);
+        var last = Math.min(images.length, first + (Math.ceil(gridView.height / gridView.cellHeight) + 1) * columns);
+        var start = Math.max(0, first - thumbnailPrefetch);
+        var end = Math.min(images.length, last + thumbnailPrefetch);
+        var visibleIds = [];
+        var prefetchIds = [];
+        for (var i = start; i < end; i++) {
+            if (!thumbnailPath(images[i]) && !thumbnailMissing(images[i])) {
+                if (i >= first && i < last) {
+                    visibleIds.push(images[i].id);
+                } else {
+                    prefetchIds.push(images[i].id);
+                }
+            }
+        }
+        if (visibleIds.length > 0 || prefetchIds.length > 0) {
+            thumbnailsNeeded(visibleIds, prefetchIds);
+        }
+    }
+
+    /*!
+     * Show thumbnails that finished downloading without rebuilding the grid.
+     * Entries marked failed are retried later instead.
+     * @param readyImages Array of { id, filePath, failed } objects
+     */
+    function thumbnailsReady(readyImages) {
+        var ready = {};
+        var failed = {};
+        var key;
+        for (key in readyThumbnails) {
+            ready[key] = readyThumbnails[key];
+        }
+        for (key in failedThumbnails) {
+            failed[key] = failedThumbnails[key];
+        }
+        var retry = false;
+        for (var i = 0; i < readyImages.length; i++) {
+            var id = readyImages[i].id;
+            if (readyImages[i].failed) {
+                failed[id] = (failed[id] || 0) + 1;
+                retry = retry || failed[id] < thumbnailRetries;
+            } else {
+                ready[id] = readyImages[i].filePath;
+                delete failed[id];
+            }
+        }
+        readyThumbnails = ready;
+        failedThumbnails = failed;
+        if (retry) {
+            thumbnailRetryTimer.restart();
+        }
+    }
+
+    function thumbnailMissing(imageData) {
+        return (failedThumbnails[imageData.id] || 0) >= thumbnailRetries;
+    }
+
+    function thumbnailPath(imageData) {
+        return readyThumbnails[imageData.id] || imageData.filePath || "";
+    }
+
+    function withThumbnail(imageData) {
+        if (imageData.filePath || !readyThumbnails[imageData.id]) {
+            return imageData;
+        }
+        var result = {};
+        for (var key in imageData) {
+            result[key] = imageData[key];
+        }
+        result.filePath = readyThumbnails[imageData.id];
+        return result;
+    }
+
+    onImagesChanged: {
+        readyThumbnails = {};
+        failedThumbnails = {};
+    }
+
     function exitSelectionMode() {
         selectionMode = false;
         selectedImages = [];
@@ -160,6 +272,7 @@ Item {
 
         onContentYChanged: {
             root.scrollPosition = contentY;
+            thumbnailTimer.restart();
             scrollToTopButton.visible = contentY > height;
             if (root.images.length > 0) {
                 var firstVisibleIndex = gridView.indexAt(root.spacing, contentY + root.spacing);
@@ -190,7 +303,7 @@ Item {
                     id: thumbnail
                     anchors.fill: parent
 
-                    source: modelData.filePath ? modelData.filePath : ""
+                    source: root.thumbnailPath(modelData)
 
                     sourceSize.width: root.cellSize
                     sourceSize.height: root.cellSize
@@ -213,6 +326,15 @@ Item {
                     }
                 }
 
+                Icon {
+                    anchors.centerIn: parent
+                    name: "image-x-generic-symbolic"
+                    width: units.gu(3)
+                    height: units.gu(3)
+                    color: theme.palette.normal.backgroundSecondaryText
+                    visible: root.thumbnailMissing(modelData)
+                }
+
                 Rectangle {
                     id: durationBadge
                     visible: modelData.duration !== undefined && modelData.duration !== null
@@ -269,7 +391,7 @@ Item {
                         if (root.selectionMode) {
                             root.toggleImageSelection(modelData, index);
                         } else {
-                            root.imageClicked(modelData);
+                            root.imageClicked(root.withThumbnail(modelData));
                         }
                     }
 
@@ -283,6 +405,24 @@ Item {
             }
         }
 
+        Timer {
+            id: thumbnailTimer
+            interval: 150
+            repeat: false
+            onTriggered: {
+                root.requestVisibleThumbnails();
+            }
+        }
+
+        Timer {
+            id: thumbnailRetryTimer
+            interval: root.thumbnailRetryInterval
+            repeat: false
+            onTriggered: {
+                root.requestVisibleThumbnails();
+            }
+        }
+
         Timer {
             id: loadTimer
             interval: 100
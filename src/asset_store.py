@@ -0,0 +1,251 @@
+"""
+Copyright (C) 2025  Brenno Flávio de Almeida
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; version 3.
+
+picpocket is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from dataclasses import astuple, dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.ut_components.event import Event
+from src.ut_components.kv import get_connection, register_schema
+
+ASSET_TTL_SECONDS = 300
+ASSET_RETENTION_SECONDS = 604800
+
+register_schema(
+    """
+    CREATE TABLE IF NOT EXISTS assets (
+        id TEXT PRIMARY KEY,
+        name TEXT DEFAULT NULL,
+        type TEXT DEFAULT NULL,
+        favorite INTEGER DEFAULT NULL,
+        archived INTEGER DEFAULT NULL,
+        trashed INTEGER DEFAULT NULL,
+        fileCreatedAt TEXT DEFAULT NULL,
+        duration TEXT DEFAULT NULL,
+        fetched_at INTEGER NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_assets_fetched_at ON assets (fetched_at)",
+)
+
+
+@dataclass
+class AssetRecord:
+    id: str
+    name: Optional[str] = None
+    type: Optional[str] = None
+    favorite: Optional[bool] = None
+    archived: Optional[bool] = None
+    trashed: Optional[bool] = None
+    fileCreatedAt: Optional[str] = None
+    duration: Optional[str] = None
+    fetched_at: int = 0
+
+    @property
+    def complete(self) -> bool:
+        return (
+            bool(self.name)
+            and bool(self.type)
+            and self.favorite is not None
+            and self.archived is not None
+            and self.trashed is not None
+        )
+
+
+def _now() -> int:
+    return int(datetime.now().timestamp())
+
+
+def _optional_bool(value: Any) -> Optional[bool]:
+    if value is None:
+        return None
+    return bool(value)
+
+
+def asset_from_json(item: Dict[str, Any], duration: Optional[str] = None) -> AssetRecord:
+    archived = item.get("isArchived")
+    if archived is None and "visibility" in item:
+        archived = item["visibility"] == "archive"
+    return AssetRecord(
+        id=item.get("id", ""),
+        name=item.get("originalFileName"),
+        type=item.get("type"),
+        favorite=item.get("isFavorite"),
+        archived=archived,
+        trashed=item.get("isTrashed"),
+        fileCreatedAt=item.get("fileCreatedAt"),
+        duration=duration,
+    )
+
+
+def get_asset(asset_id: str, max_age_seconds: int = ASSET_TTL_SECONDS) -> Optional[AssetRecord]:
+    row = (
+        get_connection()
+        .execute(
+            """
+            SELECT id, name, type, favorite, archived, trashed, fileCreatedAt, duration, fetched_at
+            FROM assets WHERE id = ? AND fetched_at > ?
+            """,
+            (asset_id, _now() - max_age_seconds),
+        )
+        .fetchone()
+    )
+    if not row:
+        return None
+    return AssetRecord(
+        id=row[0],
+        name=row[1],
+        type=row[2],
+        favorite=_optional_bool(row[3]),
+        archived=_optional_bool(row[4]),
+        trashed=_optional_bool(row[5]),
+        fileCreatedAt=row[6],
+        duration=row[7],
+        fetched_at=row[8],
+    )
+
+
+def asset_created_ats(asset_ids: Iterable[str]) -> Dict[str, Optional[str]]:
+    ids = list(dict.fromkeys(asset_ids))
+    conn = get_connection()
+    created_ats: Dict[str, Optional[str]] = {}
+    for start in range(0, len(ids), 500):
+        chunk = ids[start : start + 500]
+        placeholders = ",".join(["?" for _ in chunk])
+        rows = conn.execute(
+            f"SELECT id, fileCreatedAt FROM assets WHERE id IN ({placeholders})",
+            chunk,
+        ).fetchall()
+        created_ats.update(rows)
+    return created_ats
+
+
+def upsert_assets(records: Iterable[AssetRecord]) -> None:
+    now = _now()
+    rows: List[tuple] = []
+    for record in records:
+        if not record.id:
+            continue
+        record.fetched_at = now
+        rows.append(astuple(record))
+    _upsert_rows(rows)
+
+
+def upsert_asset_columns(
+    ids: List[str],
+    types: List[Optional[str]],
+    favorites: List[Optional[bool]],
+    archived: List[Optional[bool]],
+    trashed: List[Optional[bool]],
+    file_created_ats: List[Optional[str]],
+    durations: List[Optional[str]],
+) -> None:
+    now = _now()
+    _upsert_rows(
+        [
+            (id_, None, type_, favorite, archived_, trashed_, file_created_at, duration, now)
+            for id_, type_, favorite, archived_, trashed_, file_created_at, duration in zip(
+                ids, types, favorites, archived, trashed, file_created_ats, durations
+            )
+            if id_
+        ]
+    )
+
+
+def _upsert_rows(rows: List[tuple]) -> None:
+    if not rows:
+        return
+
+    conn = get_connection()
+    conn.executemany(
+        """
+        INSERT INTO assets (id, name, type, favorite, archived, trashed, fileCreatedAt, duration, fetched_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (id) DO UPDATE SET
+            name = COALESCE(excluded.name, assets.name),
+            type = COALESCE(excluded.type, assets.type),
+            favorite = COALESCE(excluded.favorite, assets.favorite),
+            archived = COALESCE(excluded.archived, assets.archived),
+            trashed = COALESCE(excluded.trashed, assets.trashed),
+            fileCreatedAt = COALESCE(excluded.fileCreatedAt, assets.fileCreatedAt),
+            duration = COALESCE(excluded.duration, assets.duration),
+            fetched_at = CASE
+                WHEN COALESCE(excluded.name, '') != ''
+                    AND excluded.type IS NOT NULL
+                    AND excluded.favorite IS NOT NULL
+                    AND excluded.archived IS NOT NULL
+                    AND excluded.trashed IS NOT NULL
+                THEN excluded.fetched_at
+                ELSE assets.fetched_at
+            END
+        """,
+        rows,
+    )
+    conn.commit()
+
+
+def update_assets(
+    asset_ids: Iterable[str],
+    favorite: Optional[bool] = None,
+    archived: Optional[bool] = None,
+    trashed: Optional[bool] = None,
+) -> None:
+    upsert_assets(AssetRecord(id=id_, favorite=favorite, archived=archived, trashed=trashed) for id_ in asset_ids)
+
+
+def delete_assets(asset_ids: Optional[Iterable[str]] = None) -> None:
+    conn = get_connection()
+    if asset_ids is None:
+        conn.execute("DELETE FROM assets")
+    else:
+        conn.executemany("DELETE FROM assets WHERE id = ?", [(id_,) for id_ in asset_ids])
+    conn.commit()
+
+
+def delete_stale_assets(
+    max_age_seconds: int = ASSET_RETENTION_SECONDS, batch_size: int = 500, max_batches: Optional[int] = None
+) -> int:
+    conn = get_connection()
+    cutoff = _now() - max_age_seconds
+    deleted = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        cursor = conn.execute(
+            "DELETE FROM assets WHERE rowid IN (SELECT rowid FROM assets WHERE fetched_at <= ? LIMIT ?)",
+            (cutoff, batch_size),
+        )
+        conn.commit()
+        deleted += cursor.rowcount
+        batches += 1
+        if cursor.rowcount < batch_size:
+            break
+    return deleted
+
+
+class AssetSweepEvent(Event):
+    def __init__(
+        self,
+        id: str,
+        execution_interval: Optional[timedelta] = None,
+        batch_size: int = 500,
+        max_batches: Optional[int] = 20,
+    ) -> None:
+        super().__init__(id, execution_interval)
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+
+    def trigger(self, metadata: Optional[Dict]) -> None:
+        delete_stale_assets(batch_size=self.batch_size, max_batches=self.max_batches)
@@ -22,36 +22,68 @@ from src.ut_components import setup
 
 setup(APP_NAME, CRASH_REPORT_URL)
 
+import functools
 import hashlib
 import os
 import shutil
-from concurrent.futures import ThreadPoolExecutor
+import threading
+from concurrent.futures import Future
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 from json import JSONDecodeError
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
+
+import pyotherside
 
 import src.picpocket_http as http
+from src.asset_store import (
+    AssetSweepEvent,
+    asset_created_ats,
+    delete_assets,
+    update_assets,
+    upsert_asset_columns,
+)
 from src.immich_utils import (
     api_url,
     asset_info,
+    bucket_months,
+    day_titles,
     delete_asset_info,
     delete_buckets,
     download_original,
     download_people_thumbnail,
+    download_result,
     download_thumbnail,
     get_bucket,
     metadata_search,
     parse_duration,
+    save_sequence,
     smart_search,
+    submit_download,
+    thumbnail_folder,
+    thumbnail_path,
     upload_photo,
 )
 from src.ut_components.config import get_cache_path
 from src.ut_components.crash import crash_reporter, get_crash_report, set_crash_report
+from src.ut_components.event import KVSweepEvent, get_event_dispatcher
 from src.ut_components.kv import KV
-from src.ut_components.memoize import delete_all_memoized, memoize
+from src.ut_components.memoize import (
+    delete_all_memoized,
+    delete_memoized,
+    invalidate_tags,
+    memoize,
+    tag_memoized,
+)
+from src.ut_components.scheduler import Priority, get_download_scheduler
 from src.ut_components.utils import dataclass_to_dict
 
+THUMBNAILS_READY_EVENT = "thumbnails-ready"
+THUMBNAIL_WINDOW = 120
+THUMBNAIL_PREFETCH = 60
+TIMELINE_PREFETCH_DEPTH = 1
+TIMELINE_PREFETCH_THUMBNAILS = 30
+
 
 def set_crash_logs(crash_logs: bool):
     set_crash_report(crash_logs)
@@ -140,12 +172,12 @@ class TimelineResponse:
     images: List[Image]
     previous: str
     next: str
+    page: str = ""
 
 
-@memoize(300)
+@memoize(300, stale_ttl=86400)
 @crash_reporter
-@dataclass_to_dict
-def base_timeline(prefix: str, bucket: str = "", query_args: Dict[str, str] = {}) -> TimelineResponse:
+def base_timeline(prefix: str, bucket: str = "", query_args: Dict[str, str] = {}) -> Dict:
     with KV() as kv:
         url = kv.get("immich.url")
         token = kv.get("immich.token")
@@ -153,15 +185,19 @@ def base_timeline(prefix: str, bucket: str = "", query_args: Dict[str, str] = {}
         if not url or not token:
             raise ValueError("Missing URL or token")
 
-        bucket_obj = get_bucket(url, token, bucket, query_args)
+        listing_tag = prefix.replace(".", ":", 1)
+        tag_memoized(listing_tag)
+        bucket_obj = get_bucket(url, token, bucket, query_args, tags=[listing_tag])
 
         if not bucket_obj.current:
-            return TimelineResponse(
-                title=datetime.now().strftime("%B, %d, %Y"),
-                images=[],
-                previous=bucket_obj.previous,
-                next=bucket_obj.next,
-            )
+            tag_memoized("buckets")
+            return {
+                "title": datetime.now().strftime("%B, %d, %Y"),
+                "images": [],
+                "previous": bucket_obj.previous,
+                "next": bucket_obj.next,
+                "page": "",
+            }
 
         response = http.get(
             url=api_url(url, "/api/timeline/bucket"),
@@ -172,42 +208,204 @@ def base_timeline(prefix: str, bucket: str = "", query_args: Dict[str, str] = {}
         json_response = response.json()
 
         ids = json_response.get("id", [])
-        created_ats = [x.split(".")[0] for x in json_response.get("fileCreatedAt", [])]
-        days = [x[8:10] for x in json_response.get("fileCreatedAt", [])]
-        durations = json_response.get("duration", [])
-
-        with ThreadPoolExecutor() as pool:
-            futures = []
-            for i, id_ in enumerate(ids):
-                duration = parse_duration(durations[i])
-                if days[i]:
-                    title = datetime.fromisoformat(created_ats[i]).strftime("%B, %d, %Y")
-                else:
-                    title = ""
-                futures.append(pool.submit(thumbnail, url, token, id_, duration, title))
-                if i - 1 >= 0:
-                    kv.put_cached(f"{prefix}.{id_}.previous", ids[i - 1])
-                if i + 1 < len(ids):
-                    kv.put_cached(f"{prefix}.{id_}.next", ids[i + 1])
-            kv.commit_cached()
-
-            images = []
-            for future in futures:
-                result = future.result()
-                if result:
-                    images.append(result)
-
-        title = datetime.fromisoformat(bucket_obj.current).strftime("%B, %Y")
-        return TimelineResponse(
-            title=title,
-            images=images,
-            previous=bucket_obj.previous,
-            next=bucket_obj.next,
+        empty = [None] * len(ids)
+        file_created_ats = json_response.get("fileCreatedAt") or empty
+        raw_durations = json_response.get("duration") or empty
+        is_images = json_response.get("isImage") or empty
+        favorites = json_response.get("isFavorite") or empty
+        visibilities = json_response.get("visibility") or empty
+        trashed = json_response.get("isTrashed") or empty
+        columns = (file_created_ats, raw_durations, is_images, favorites, visibilities, trashed)
+        if any(len(column) != len(ids) for column in columns):
+            raise ValueError(f"Timeline bucket {bucket_obj.current} has columns of different lengths")
+        durations = [parse_duration(x) if x else None for x in raw_durations]
+        titles = day_titles(file_created_ats)
+        tag_memoized(f"bucket:{bucket_obj.current[:7]}", *asset_tags(ids))
+
+        save_sequence(kv, prefix, bucket_obj.current, ids)
+        kv.commit_cached()
+        upsert_asset_columns(
+            ids,
+            [None if x is None else ("IMAGE" if x else "VIDEO") for x in is_images],
+            favorites,
+            [None if x is None else x == "archive" for x in visibilities],
+            trashed,
+            file_created_ats,
+            durations,
+        )
+
+        folder = thumbnail_folder()
+        return {
+            "title": datetime.fromisoformat(bucket_obj.current).strftime("%B, %Y"),
+            "images": [
+                {"filePath": os.path.join(folder, f"{id_}.webp"), "id": id_, "duration": duration, "title": title}
+                for id_, duration, title in zip(ids, durations, titles)
+            ],
+            "previous": bucket_obj.previous,
+            "next": bucket_obj.next,
+            "page": bucket_obj.current,
+        }
+
+
+class ThumbnailPusher:
+    def __init__(self, group: str, interval: float = 0.1, max_batch: int = 50) -> None:
+        self.group = group
+        self.interval = interval
+        self.max_batch = max_batch
+        self._batch: List[Dict[str, Any]] = []
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def done(self, image_id: str, future: Future) -> None:
+        if future.cancelled():
+            return
+        file_path = "" if future.exception() is not None else future.result()
+        if file_path and os.path.isfile(file_path):
+            entry = {"id": image_id, "filePath": file_path}
+        else:
+            entry = {"id": image_id, "filePath": "", "failed": True}
+        with self._lock:
+            self._batch.append(entry)
+            if len(self._batch) < self.max_batch:
+                if self._timer is None:
+                    self._timer = threading.Timer(self.interval, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+        self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            batch, self._batch = self._batch, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if batch:
+            pyotherside.send(THUMBNAILS_READY_EVENT, {"group": self.group, "images": batch})
+
+
+def queue_thumbnails(group: str, visible_ids: List[str], prefetch_ids: List[str]) -> int:
+    with KV() as kv:
+        url = kv.get("immich.url")
+        token = kv.get("immich.token")
+    if not url or not token:
+        raise ValueError("Missing URL or token")
+
+    pusher = ThumbnailPusher(group)
+    queued = 0
+    for image_ids, priority in ((visible_ids, Priority.VISIBLE), (prefetch_ids, Priority.PREFETCH)):
+        for image_id in image_ids:
+            future = submit_download(url, group, download_thumbnail, url, token, image_id, priority=priority)
+            future.add_done_callback(functools.partial(pusher.done, image_id))
+            queued += 1
+    return queued
+
+
+def stream_thumbnails(
+    response: Dict,
+    group: str,
+    offset: int = 0,
+    limit: int = THUMBNAIL_WINDOW,
+    prefetch: int = THUMBNAIL_PREFETCH,
+) -> Dict:
+    # Only images around the window are checked on disk. The rest start blank
+    # and are requested by the gallery once they scroll into view.
+    images = [{**image, "filePath": ""} for image in response["images"]]
+    visible_ids = []
+    prefetch_ids = []
+    start = max(0, offset - prefetch)
+    end = min(len(images), offset + limit + prefetch)
+    for i in range(start, end):
+        image = response["images"][i]
+        if os.path.isfile(image["filePath"]):
+            images[i] = image
+        elif offset <= i < offset + limit:
+            visible_ids.append(image["id"])
+        else:
+            prefetch_ids.append(image["id"])
+
+    if visible_ids or prefetch_ids:
+        queue_thumbnails(group, visible_ids, prefetch_ids)
+    return {**response, "images": images}
+
+
+@crash_reporter
+def fetch_thumbnails(group: str, visible_ids: List[str], prefetch_ids: List[str]) -> int:
+    get_download_scheduler().cancel_group(group)
+    return queue_thumbnails(group, visible_ids, prefetch_ids)
+
+
+def prefetch_bucket(prefix: str, bucket: str, query_args: Dict[str, str], direction: str, depth: int) -> None:
+    response = base_timeline(prefix, bucket, query_args)
+    with KV() as kv:
+        url = kv.get("immich.url")
+        token = kv.get("immich.token")
+    if not url or not token:
+        return
+
+    group = f"{prefix}.prefetch"
+    for image in response["images"][:TIMELINE_PREFETCH_THUMBNAILS]:
+        if not os.path.isfile(image["filePath"]):
+            submit_download(url, group, download_thumbnail, url, token, image["id"], priority=Priority.PREFETCH)
+    if depth > 1 and response[direction]:
+        submit_download(
+            url,
+            group,
+            prefetch_bucket,
+            prefix,
+            response[direction],
+            query_args,
+            direction,
+            depth - 1,
+            priority=Priority.PREFETCH,
         )
 
 
+def prefetch_adjacent(prefix: str, query_args: Dict[str, str], response: Dict) -> None:
+    group = f"{prefix}.prefetch"
+    get_download_scheduler().cancel_group(group)
+    if TIMELINE_PREFETCH_DEPTH < 1:
+        return
+
+    with KV() as kv:
+        url = kv.get("immich.url")
+    for direction in ("previous", "next"):
+        if response[direction]:
+            submit_download(
+                url,
+                group,
+                prefetch_bucket,
+                prefix,
+                response[direction],
+                query_args,
+                direction,
+                TIMELINE_PREFETCH_DEPTH,
+                priority=Priority.PREFETCH,
+            )
+
+
+def stream_timeline(prefix: str, bucket: str, query_args: Dict[str, str]) -> Dict:
+    response = stream_thumbnails(base_timeline(prefix, bucket, query_args), prefix)
+    prefetch_adjacent(prefix, query_args, response)
+    return response
+
+
 def timeline(bucket: str = "") -> TimelineResponse:
-    return base_timeline("timeline", bucket, query_args={"visibility": "timeline"})
+    return stream_timeline("timeline", bucket, {"visibility": "timeline"})
+
+
+def asset_tags(image_ids: List[str]) -> List[str]:
+    return [f"asset:{id_}" for id_ in image_ids]
+
+
+def invalidate_restored(image_ids: List[str], *tags: str):
+    created_ats = asset_created_ats(image_ids)
+    if all(created_ats.get(id_) for id_ in image_ids):
+        month_tags = [f"bucket:{month}" for created_at in created_ats.values() for month in bucket_months(created_at)]
+    else:
+        month_tags = []
+        delete_memoized(base_timeline)
+    invalidate_tags(*asset_tags(image_ids), *month_tags, "buckets", "location", "search", "memories", *tags)
 
 
 @dataclass
@@ -223,25 +421,25 @@ class Preview:
     deleted: bool
 
 
+def _preview(image_id: str, neighbours_prefix: str, page: str = "") -> Preview:
+    asset_info_data = asset_info(image_id, neighbours_prefix, page)
+    return Preview(
+        filePath=asset_info_data.file_path,
+        id=image_id,
+        name=asset_info_data.name,
+        file_type=asset_info_data.file_type,
+        previous=asset_info_data.previous,
+        next=asset_info_data.next,
+        favorite=asset_info_data.favorite,
+        archived=asset_info_data.archived,
+        deleted=asset_info_data.deleted,
+    )
+
+
 @crash_reporter
 @dataclass_to_dict
-def timeline_preview(image_id: str) -> Preview:
-    asset_info_data = asset_info(image_id)
-    with KV() as kv:
-        previous = kv.get(f"timeline.{image_id}.previous")
-        next_ = kv.get(f"timeline.{image_id}.next")
-
-        return Preview(
-            filePath=asset_info_data.file_path,
-            id=image_id,
-            name=asset_info_data.name,
-            file_type=asset_info_data.file_type,
-            previous=previous,
-            next=next_,
-            favorite=asset_info_data.favorite,
-            archived=asset_info_data.archived,
-            deleted=asset_info_data.deleted,
-        )
+def timeline_preview(image_id: str, page: str = "") -> Preview:
+    return _preview(image_id, "timeline", page)
 
 
 @crash_reporter
@@ -250,6 +448,20 @@ def original(image_id: str) -> str:
     return file_path
 
 
+@crash_reporter
+def start_event_loop():
+    dispatcher = get_event_dispatcher()
+    dispatcher.register_event(KVSweepEvent(id="kv-sweep", execution_interval=timedelta(minutes=15)))
+    dispatcher.register_event(AssetSweepEvent(id="asset-sweep", execution_interval=timedelta(minutes=15)))
+    dispatcher.start()
+
+
+@crash_reporter
+def cancel_downloads(group: str) -> int:
+    scheduler = get_download_scheduler()
+    return scheduler.cancel_group(group) + scheduler.cancel_group(f"{group}.prefetch")
+
+
 @crash_reporter
 def logout():
     with KV() as kv:
@@ -273,9 +485,8 @@ def favorite(image_id: str, favorite: bool):
         )
         response.raise_for_status()
 
-        kv.put(f"photo.{image_id}.favorite", favorite, ttl_seconds=300)
-        kv.delete_partial("favorite")
-        delete_all_memoized()
+        update_assets([image_id], favorite=favorite)
+    invalidate_tags("favorite")
 
 
 @crash_reporter
@@ -293,7 +504,8 @@ def archive(*image_ids: str):
             headers={"Authorization": f"Bearer {token}"},
         )
         response.raise_for_status()
-    delete_all_memoized()
+        update_assets(image_ids, archived=True)
+    invalidate_tags(*asset_tags(image_ids), "buckets", "archived")
 
 
 @crash_reporter
@@ -311,7 +523,8 @@ def delete(*image_ids: str):
             headers={"Authorization": f"Bearer {token}"},
         )
         response.raise_for_status()
-    delete_all_memoized()
+        update_assets(image_ids, trashed=True)
+    invalidate_tags(*asset_tags(image_ids), "buckets", "deleted", "albums")
 
 
 def delete_cache():
@@ -345,6 +558,7 @@ def clear_cache():
         kv.delete_partial("archived")
         kv.delete_partial("deleted")
         kv.delete_partial("person")
+        kv.delete_partial("sequence")
     delete_buckets()
     delete_asset_info()
     delete_all_memoized()
@@ -362,7 +576,7 @@ class MemoryContainer:
     memories: List[Memory]
 
 
-@memoize(43200)
+@memoize(43200, stale_ttl=43200, revalidate=True)
 @crash_reporter
 @dataclass_to_dict
 def memories() -> MemoryContainer:
@@ -377,6 +591,7 @@ def memories() -> MemoryContainer:
             url=api_url(url, "/api/memories"),
             params={"for": datetime.now().date().isoformat()},
             headers={"Authorization": f"Bearer {token}"},
+            revalidate=True,
         )
         response.raise_for_status()
         json_response = response.json()
@@ -399,36 +614,19 @@ def memories() -> MemoryContainer:
             file_path = download_thumbnail(url, token, first_asset_image_id)
             memories.append(Memory(title=str(year), thumbnail_url=file_path, first_image_id=first_asset_image_id))
 
-            for i, asset in enumerate(assets):
-                asset_id = asset.get("id")
-                if i - 1 >= 0:
-                    kv.put_cached(f"memory.{asset_id}.previous", assets[i - 1]["id"])
-                if i + 1 < len(assets):
-                    kv.put_cached(f"memory.{asset_id}.next", assets[i + 1]["id"])
-            kv.commit_cached()
+            asset_ids = [asset.get("id") for asset in assets]
+            save_sequence(kv, "memory", first_asset_image_id, asset_ids)
+            tag_memoized(*asset_tags(asset_ids))
+        kv.commit_cached()
+        tag_memoized("memories")
 
         return MemoryContainer(memories=memories)
 
 
 @crash_reporter
 @dataclass_to_dict
-def memory_preview(image_id: str) -> Preview:
-    asset_info_data = asset_info(image_id)
-    with KV() as kv:
-        previous = kv.get(f"memory.{image_id}.previous")
-        next_ = kv.get(f"memory.{image_id}.next")
-
-        return Preview(
-            filePath=asset_info_data.file_path,
-            id=image_id,
-            name=asset_info_data.name,
-            file_type=asset_info_data.file_type,
-            previous=previous,
-            next=next_,
-            favorite=asset_info_data.favorite,
-            archived=asset_info_data.archived,
-            deleted=asset_info_data.deleted,
-        )
+def memory_preview(image_id: str, page: str = "") -> Preview:
+    return _preview(image_id, "memory", page)
 
 
 @dataclass
@@ -445,7 +643,7 @@ class Albums:
     albums: List[Album]
 
 
-@memoize(300)
+@memoize(300, revalidate=True)
 @dataclass_to_dict
 def albums():
     with KV() as kv:
@@ -455,9 +653,12 @@ def albums():
         if not url or not token:
             raise ValueError("Missing URL or token")
 
+        tag_memoized("albums")
+
         response = http.get(
             url=api_url(url, "/api/albums"),
             headers={"Authorization": f"Bearer {token}"},
+            revalidate=True,
         )
         response.raise_for_status()
         json_response = response.json()
@@ -475,6 +676,7 @@ def albums():
                 continue
 
             file_path = download_thumbnail(url, token, thumbnail_asset_id)
+            tag_memoized(f"asset:{thumbnail_asset_id}")
             final_response.append(Album(id=id_, file_path=file_path, name=name, asset_count=asset_count, shared=shared))
 
     return Albums(albums=final_response)
@@ -498,6 +700,8 @@ def upload_immich_photo(file_paths: List[str]) -> ImmichResponse:
                 success_count += 1
             else:
                 error_count += 1
+        if success_count:
+            invalidate_tags("timeline", "buckets")
         success = not bool(error_count)
         message = f"Uploaded {success_count} photos with {error_count} errors"
         return ImmichResponse(success=success, message=message)
@@ -506,7 +710,7 @@ def upload_immich_photo(file_paths: List[str]) -> ImmichResponse:
 @memoize(300)
 @crash_reporter
 @dataclass_to_dict
-def album_detail(album_id: str) -> TimelineResponse:
+def base_album_detail(album_id: str) -> TimelineResponse:
     with KV() as kv:
         url = kv.get("immich.url")
         token = kv.get("immich.token")
@@ -530,32 +734,18 @@ def album_detail(album_id: str) -> TimelineResponse:
             page = search_response.previous
 
         ids = [asset.id for asset in assets]
+        tag_memoized("album", f"album:{album_id}", *asset_tags(ids))
 
-        with ThreadPoolExecutor() as pool:
-            futures = []
-            for i, asset in enumerate(assets):
-                id_ = asset.id
-
-                parsed_duration = asset.duration
-
-                created_at = asset.created_at.split(".")[0]
-                if created_at:
-                    title = datetime.fromisoformat(created_at).strftime("%B, %d, %Y")
-                else:
-                    title = ""
-
-                futures.append(pool.submit(thumbnail, url, token, id_, parsed_duration, title))
-                if i - 1 >= 0:
-                    kv.put_cached(f"album.{album_id}.{id_}.previous", ids[i - 1])
-                if i + 1 < len(ids):
-                    kv.put_cached(f"album.{album_id}.{id_}.next", ids[i + 1])
-            kv.commit_cached()
-
-            images = []
-            for future in futures:
-                result = future.result()
-                if result:
-                    images.append(result)
+        images = []
+        for asset in assets:
+            created_at = asset.created_at.split(".")[0]
+            if created_at:
+                title = datetime.fromisoformat(created_at).strftime("%B, %d, %Y")
+            else:
+                title = ""
+            images.append(Image(filePath=thumbnail_path(asset.id), id=asset.id, duration=asset.duration, title=title))
+        save_sequence(kv, f"album.{album_id}", "all", ids)
+        kv.commit_cached()
 
         if len(images) > 0:
             title = images[0].title
@@ -566,53 +756,51 @@ def album_detail(album_id: str) -> TimelineResponse:
             images=images,
             previous="",
             next="",
+            page="all",
         )
 
 
+def album_detail(
+    album_id: str, offset: int = 0, limit: int = THUMBNAIL_WINDOW, prefetch: int = THUMBNAIL_PREFETCH
+) -> TimelineResponse:
+    return stream_thumbnails(base_album_detail(album_id), f"album.{album_id}", offset, limit, prefetch)
+
+
 @crash_reporter
 @dataclass_to_dict
 def album_preview(image_id: str, album_id: str) -> Preview:
-    asset_info_data = asset_info(image_id)
-    with KV() as kv:
-        previous = kv.get(f"album.{album_id}.{image_id}.previous")
-        next_ = kv.get(f"album.{album_id}.{image_id}.next")
-
-        return Preview(
-            filePath=asset_info_data.file_path,
-            id=image_id,
-            name=asset_info_data.name,
-            file_type=asset_info_data.file_type,
-            previous=previous,
-            next=next_,
-            favorite=asset_info_data.favorite,
-            archived=asset_info_data.archived,
-            deleted=asset_info_data.deleted,
-        )
+    return _preview(image_id, f"album.{album_id}", "all")
 
 
 @crash_reporter
 @dataclass_to_dict
 def preview(
-    image_id: str, type: str, album_id: str = "", person_id: str = "", city: str = "", query: str = ""
+    image_id: str,
+    type: str,
+    album_id: str = "",
+    person_id: str = "",
+    city: str = "",
+    query: str = "",
+    page: str = "",
 ) -> Preview:
     if type == "timeline":
-        return timeline_preview(image_id)
+        return timeline_preview(image_id, page)
     elif type == "memory":
-        return memory_preview(image_id)
+        return memory_preview(image_id, page)
     elif type == "album":
         return album_preview(image_id, album_id)
     elif type == "person":
-        return person_preview(image_id, person_id)
+        return person_preview(image_id, person_id, page)
     elif type == "location":
-        return location_preview(image_id, city)
+        return location_preview(image_id, city, page)
     elif type == "favorite":
-        return favorite_preview(image_id)
+        return favorite_preview(image_id, page)
     elif type == "archived":
-        return archived_preview(image_id)
+        return archived_preview(image_id, page)
     elif type == "deleted":
-        return deleted_preview(image_id)
+        return deleted_preview(image_id, page)
     elif type == "search":
-        return search_preview(image_id, query)
+        return search_preview(image_id, query, page)
     else:
         raise ValueError(f"no preview for type {type}")
 
@@ -630,7 +818,7 @@ class PeopleResponse:
 
 
 @crash_reporter
-@memoize(3600)
+@memoize(3600, stale_ttl=86400, revalidate=True)
 @dataclass_to_dict
 def people() -> PeopleResponse:
     with KV() as kv:
@@ -640,55 +828,41 @@ def people() -> PeopleResponse:
         if not url or not token:
             raise ValueError("Missing URL or token")
 
+        tag_memoized("people")
         response = http.get(
             url=api_url(url, "/api/people"),
             headers={"Authorization": f"Bearer {token}"},
+            revalidate=True,
         )
         response.raise_for_status()
         json_response = response.json()
         people = json_response.get("people", [])
 
-        with ThreadPoolExecutor() as pool:
-            futures = []
-            final_response = []
-            for person in people:
-                id_ = person.get("id")
-                name = person.get("name", "")
+        futures = []
+        final_response = []
+        for person in people:
+            id_ = person.get("id")
+            name = person.get("name", "")
 
-                if not id_:
-                    continue
+            if not id_:
+                continue
 
-                futures.append((id_, name, pool.submit(download_people_thumbnail, url, token, id_)))
+            futures.append((id_, name, submit_download(url, "people", download_people_thumbnail, url, token, id_)))
 
-            for id_, name, future in futures:
-                file_path = future.result()
-                final_response.append(People(id=id_, name=name, face_path=file_path))
+        for id_, name, future in futures:
+            file_path = download_result(future, "")
+            final_response.append(People(id=id_, name=name, face_path=file_path))
     return PeopleResponse(people=final_response)
 
 
 def person_timeline(person_id: str, bucket: str = "") -> TimelineResponse:
-    return base_timeline(f"person.{person_id}", bucket, {"personId": person_id, "visibility": "timeline"})
+    return stream_timeline(f"person.{person_id}", bucket, {"personId": person_id, "visibility": "timeline"})
 
 
 @crash_reporter
 @dataclass_to_dict
-def person_preview(image_id: str, person_id: str) -> Preview:
-    asset_info_data = asset_info(image_id)
-    with KV() as kv:
-        previous = kv.get(f"person.{person_id}.{image_id}.previous")
-        next_ = kv.get(f"person.{person_id}.{image_id}.next")
-
-        return Preview(
-            filePath=asset_info_data.file_path,
-            id=image_id,
-            name=asset_info_data.name,
-            file_type=asset_info_data.file_type,
-            previous=previous,
-            next=next_,
-            favorite=asset_info_data.favorite,
-            archived=asset_info_data.archived,
-            deleted=asset_info_data.deleted,
-        )
+def person_preview(image_id: str, person_id: str, page: str = "") -> Preview:
+    return _preview(image_id, f"person.{person_id}", page)
 
 
 @dataclass
@@ -705,7 +879,7 @@ class LocationResponse:
 
 
 @crash_reporter
-@memoize(3600)
+@memoize(3600, revalidate=True)
 @dataclass_to_dict
 def locations() -> LocationResponse:
     with KV() as kv:
@@ -715,38 +889,42 @@ def locations() -> LocationResponse:
         if not url or not token:
             raise ValueError("Missing URL or token")
 
+        tag_memoized("locations")
         response = http.get(
             url=api_url(url, "/api/search/cities"),
             headers={"Authorization": f"Bearer {token}"},
+            revalidate=True,
         )
         response.raise_for_status()
         json_response = response.json()
         locations = json_response
 
-        with ThreadPoolExecutor() as pool:
-            futures = []
-            final_response = []
-            for location in locations:
-                id_ = location.get("exifInfo", {}).get("city")
-
-                if not id_:
-                    continue
-
-                city = location.get("exifInfo", {}).get("city")
-                state = location.get("exifInfo", {}).get("state")
-                country = location.get("exifInfo", {}).get("country")
-                asset_id = location.get("id")
-
-                futures.append((id_, city, state, country, pool.submit(download_thumbnail, url, token, asset_id)))
-
-            for id_, city, state, country, future in futures:
-                file_path = future.result()
-                subtitle = ""
-                if state:
-                    subtitle = state
-                if country:
-                    subtitle = f"{subtitle}, {country}"
-                final_response.append(Location(id=id_, title=city, subtitle=subtitle, thumbnail_path=file_path))
+        futures = []
+        final_response = []
+        for location in locations:
+            id_ = location.get("exifInfo", {}).get("city")
+
+            if not id_:
+                continue
+
+            city = location.get("exifInfo", {}).get("city")
+            state = location.get("exifInfo", {}).get("state")
+            country = location.get("exifInfo", {}).get("country")
+            asset_id = location.get("id")
+
+            tag_memoized(f"asset:{asset_id}")
+            futures.append(
+                (id_, city, state, country, submit_download(url, "locations", download_thumbnail, url, token, asset_id))
+            )
+
+        for id_, city, state, country, future in futures:
+            file_path = download_result(future, "")
+            subtitle = ""
+            if state:
+                subtitle = state
+            if country:
+                subtitle = f"{subtitle}, {country}"
+            final_response.append(Location(id=id_, title=city, subtitle=subtitle, thumbnail_path=file_path))
     return LocationResponse(locations=final_response)
 
 
@@ -763,30 +941,27 @@ def location_detail(city: str, bucket: str = "") -> TimelineResponse:
 
         search_response = metadata_search(url, token, {"city": city}, bucket)
         ids = [asset.id for asset in search_response.assets]
+        tag_memoized("location", f"location:{city}", *asset_tags(ids))
 
-        with ThreadPoolExecutor() as pool:
-            futures = []
-            for i, asset in enumerate(search_response.assets):
-                id_ = asset.id
-
-                created_at = asset.created_at.split(".")[0]
-                if created_at:
-                    title = datetime.fromisoformat(created_at).strftime("%B, %d, %Y")
-                else:
-                    title = ""
-
-                futures.append(pool.submit(thumbnail, url, token, id_, asset.duration, title))
-                if i - 1 >= 0:
-                    kv.put_cached(f"location.{city}.{id_}.previous", ids[i - 1])
-                if i + 1 < len(ids):
-                    kv.put_cached(f"location.{city}.{id_}.next", ids[i + 1])
-            kv.commit_cached()
-
-            images = []
-            for future in futures:
-                result = future.result()
-                if result:
-                    images.append(result)
+        futures = []
+        for asset in search_response.assets:
+            id_ = asset.id
+
+            created_at = asset.created_at.split(".")[0]
+            if created_at:
+                title = datetime.fromisoformat(created_at).strftime("%B, %d, %Y")
+            else:
+                title = ""
+
+            futures.append(submit_download(url, f"location.{city}", thumbnail, url, token, id_, asset.duration, title))
+        save_sequence(kv, f"location.{city}", bucket, ids)
+        kv.commit_cached()
+
+        images = []
+        for future in futures:
+            result = download_result(future)
+            if result:
+                images.append(result)
 
         if len(images) > 0:
             title = images[0].title
@@ -797,78 +972,34 @@ def location_detail(city: str, bucket: str = "") -> TimelineResponse:
             images=images,
             previous=search_response.previous,
             next=search_response.next,
+            page=bucket,
         )
 
 
 @crash_reporter
 @dataclass_to_dict
-def location_preview(image_id: str, city: str) -> Preview:
-    asset_info_data = asset_info(image_id)
-    with KV() as kv:
-        previous = kv.get(f"location.{city}.{image_id}.previous")
-        next_ = kv.get(f"location.{city}.{image_id}.next")
-
-        return Preview(
-            filePath=asset_info_data.file_path,
-            id=image_id,
-            name=asset_info_data.name,
-            file_type=asset_info_data.file_type,
-            previous=previous,
-            next=next_,
-            favorite=asset_info_data.favorite,
-            archived=asset_info_data.archived,
-            deleted=asset_info_data.deleted,
-        )
+def location_preview(image_id: str, city: str, page: str = "") -> Preview:
+    return _preview(image_id, f"location.{city}", page)
 
 
 def favorite_timeline(bucket: str = "") -> TimelineResponse:
-    return base_timeline("favorite", bucket, {"isFavorite": "true", "visibility": "timeline"})
+    return stream_timeline("favorite", bucket, {"isFavorite": "true", "visibility": "timeline"})
 
 
 @crash_reporter
 @dataclass_to_dict
-def favorite_preview(image_id: str) -> Preview:
-    asset_info_data = asset_info(image_id)
-    with KV() as kv:
-        previous = kv.get(f"favorite.{image_id}.previous")
-        next_ = kv.get(f"favorite.{image_id}.next")
-
-        return Preview(
-            filePath=asset_info_data.file_path,
-            id=image_id,
-            name=asset_info_data.name,
-            file_type=asset_info_data.file_type,
-            previous=previous,
-            next=next_,
-            favorite=asset_info_data.favorite,
-            archived=asset_info_data.archived,
-            deleted=asset_info_data.deleted,
-        )
+def favorite_preview(image_id: str, page: str = "") -> Preview:
+    return _preview(image_id, "favorite", page)
 
 
 def archived_timeline(bucket: str = "") -> TimelineResponse:
-    return base_timeline("archived", bucket, {"visibility": "archive"})
+    return stream_timeline("archived", bucket, {"visibility": "archive"})
 
 
 @crash_reporter
 @dataclass_to_dict
-def archived_preview(image_id: str) -> Preview:
-    asset_info_data = asset_info(image_id)
-    with KV() as kv:
-        previous = kv.get(f"archived.{image_id}.previous")
-        next_ = kv.get(f"archived.{image_id}.next")
-
-        return Preview(
-            filePath=asset_info_data.file_path,
-            id=image_id,
-            name=asset_info_data.name,
-            file_type=asset_info_data.file_type,
-            previous=previous,
-            next=next_,
-            favorite=asset_info_data.favorite,
-            archived=asset_info_data.archived,
-            deleted=asset_info_data.deleted,
-        )
+def archived_preview(image_id: str, page: str = "") -> Preview:
+    return _preview(image_id, "archived", page)
 
 
 @crash_reporter
@@ -886,33 +1017,18 @@ def unarchive(*image_ids: str):
             headers={"Authorization": f"Bearer {token}"},
         )
         response.raise_for_status()
-        kv.delete_partial("archived")
-    delete_all_memoized()
+        update_assets(image_ids, archived=False)
+    invalidate_restored(image_ids, "archived")
 
 
 def deleted_timeline(bucket: str = "") -> TimelineResponse:
-    return base_timeline("deleted", bucket, {"isTrashed": "true"})
+    return stream_timeline("deleted", bucket, {"isTrashed": "true"})
 
 
 @crash_reporter
 @dataclass_to_dict
-def deleted_preview(image_id: str) -> Preview:
-    asset_info_data = asset_info(image_id)
-    with KV() as kv:
-        previous = kv.get(f"deleted.{image_id}.previous")
-        next_ = kv.get(f"deleted.{image_id}.next")
-
-        return Preview(
-            filePath=asset_info_data.file_path,
-            id=image_id,
-            name=asset_info_data.name,
-            file_type=asset_info_data.file_type,
-            previous=previous,
-            next=next_,
-            favorite=asset_info_data.favorite,
-            archived=asset_info_data.archived,
-            deleted=asset_info_data.deleted,
-        )
+def deleted_preview(image_id: str, page: str = "") -> Preview:
+    return _preview(image_id, "deleted", page)
 
 
 @crash_reporter
@@ -930,8 +1046,8 @@ def undelete(*image_ids: str):
             headers={"Authorization": f"Bearer {token}"},
         )
         response.raise_for_status()
-        kv.delete_partial("deleted")
-    delete_all_memoized()
+        update_assets(image_ids, trashed=False)
+    invalidate_restored(image_ids, "albums", "album")
 
 
 @crash_reporter
@@ -949,8 +1065,8 @@ def permanently_delete(*image_ids: str):
             headers={"Authorization": f"Bearer {token}"},
         )
         response.raise_for_status()
-        kv.delete_partial("deleted")
-    delete_all_memoized()
+        delete_assets(image_ids)
+    invalidate_tags(*asset_tags(image_ids), "buckets", "deleted")
 
 
 @crash_reporter
@@ -966,31 +1082,28 @@ def search(query: str, bucket: str) -> TimelineResponse:
 
         search_response = smart_search(url, token, query, bucket)
         ids = [asset.id for asset in search_response.assets]
+        tag_memoized("search", *asset_tags(ids))
         query_hash = hashlib.sha1(query.encode()).hexdigest()
 
-        with ThreadPoolExecutor() as pool:
-            futures = []
-            for i, asset in enumerate(search_response.assets):
-                id_ = asset.id
-
-                created_at = asset.created_at.split(".")[0]
-                if created_at:
-                    title = datetime.fromisoformat(created_at).strftime("%B, %d, %Y")
-                else:
-                    title = ""
-
-                futures.append(pool.submit(thumbnail, url, token, id_, asset.duration, title))
-                if i - 1 >= 0:
-                    kv.put_cached(f"search.{query_hash}.{id_}.previous", ids[i - 1])
-                if i + 1 < len(ids):
-                    kv.put_cached(f"search.{query_hash}.{id_}.next", ids[i + 1])
-            kv.commit_cached()
-
-            images = []
-            for future in futures:
-                result = future.result()
-                if result:
-                    images.append(result)
+        futures = []
+        for asset in search_response.assets:
+            id_ = asset.id
+
+            created_at = asset.created_at.split(".")[0]
+            if created_at:
+                title = datetime.fromisoformat(created_at).strftime("%B, %d, %Y")
+            else:
+                title = ""
+
+            futures.append(submit_download(url, "search", thumbnail, url, token, id_, asset.duration, title))
+        save_sequence(kv, f"search.{query_hash}", bucket, ids)
+        kv.commit_cached()
+
+        images = []
+        for future in futures:
+            result = download_result(future)
+            if result:
+                images.append(result)
 
         if len(images) > 0:
             title = images[0].title
@@ -1001,29 +1114,15 @@ def search(query: str, bucket: str) -> TimelineResponse:
             images=images,
             previous=search_response.previous,
             next=search_response.next,
+            page=bucket,
         )
 
 
 @crash_reporter
 @dataclass_to_dict
-def search_preview(image_id: str, query: str) -> Preview:
-    asset_info_data = asset_info(image_id)
-    with KV() as kv:
-        query_hash = hashlib.sha1(query.encode()).hexdigest()
-        previous = kv.get(f"search.{query_hash}.{image_id}.previous")
-        next_ = kv.get(f"search.{query_hash}.{image_id}.next")
-
-        return Preview(
-            filePath=asset_info_data.file_path,
-            id=image_id,
-            name=asset_info_data.name,
-            file_type=asset_info_data.file_type,
-            previous=previous,
-            next=next_,
-            favorite=asset_info_data.favorite,
-            archived=asset_info_data.archived,
-            deleted=asset_info_data.deleted,
-        )
+def search_preview(image_id: str, query: str, page: str = "") -> Preview:
+    query_hash = hashlib.sha1(query.encode()).hexdigest()
+    return _preview(image_id, f"search.{query_hash}", page)
 
 
 @crash_reporter
@@ -1042,6 +1141,7 @@ def add_album(name: str = "") -> ImmichResponse:
             headers={"Authorization": f"Bearer {token}"},
         )
         response.raise_for_status()
+        invalidate_tags("albums")
         return ImmichResponse(success=True, message="Album created successfully")
 
 
@@ -1060,6 +1160,7 @@ def delete_album(album_id: str) -> ImmichResponse:
             headers={"Authorization": f"Bearer {token}"},
         )
         response.raise_for_status()
+        invalidate_tags("albums", f"album:{album_id}")
 
         return ImmichResponse(success=True, message="Album deleted successfully")
 
@@ -1080,6 +1181,7 @@ def add_assets_to_album(album_id: str, asset_ids: List[str]) -> ImmichResponse:
             json={"ids": asset_ids},
         )
         response.raise_for_status()
+        invalidate_tags("albums", f"album:{album_id}")
 
         return ImmichResponse(success=True, message="Assets added to album successfully")
 
@@ -1100,5 +1202,6 @@ def delete_assets_to_album(album_id: str, asset_ids: List[str]) -> ImmichRespons
             json={"ids": asset_ids},
         )
         response.raise_for_status()
+        invalidate_tags("albums", f"album:{album_id}")
 
         return ImmichResponse(success=True, message="Assets deleted from album successfully")
@@ -25,15 +25,26 @@ from src.ut_components import setup
 setup(APP_NAME, CRASH_REPORT_URL)
 
 import os
+import tempfile
+import threading
+from concurrent.futures import CancelledError, Future
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Any, Dict, List, Optional
-from urllib.parse import urljoin
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
 
 import src.picpocket_http as http
+from src.asset_store import (
+    AssetRecord,
+    asset_from_json,
+    delete_assets,
+    get_asset,
+    upsert_assets,
+)
 from src.ut_components.config import get_cache_path
 from src.ut_components.kv import KV
-from src.ut_components.memoize import hash_function_args
+from src.ut_components.memoize import hash_function_args, skip_memoized
+from src.ut_components.scheduler import Priority, get_download_scheduler
 from src.utils import is_webp
 
 
@@ -41,26 +52,90 @@ def api_url(url: str, path: str) -> str:
     return urljoin(url.rstrip("/") + "/", path.lstrip("/"))
 
 
-def download_thumbnail(url: str, token: str, image_id: str) -> str:
-    base_folder = os.path.join(get_cache_path(), "picpocket/thumbnail")
-    os.makedirs(base_folder, exist_ok=True)
-    file_path = os.path.join(base_folder, f"{image_id}.webp")
+def submit_download(url: str, group: str, func: Callable, *args: Any, priority: Priority = Priority.VISIBLE) -> Future:
+    return get_download_scheduler().submit(func, *args, host=urlsplit(url).netloc, priority=priority, group=group)
+
+
+def download_result(future: Future, default: Any = None) -> Any:
+    # cancel_downloads() may cancel a queued download while its page is still
+    # being built. Treat it as missing, and keep the incomplete page out of the cache.
+    try:
+        return future.result()
+    except CancelledError:
+        skip_memoized()
+        return default
+
+
+_IN_FLIGHT: Dict[str, Future] = {}
+_IN_FLIGHT_LOCK = threading.Lock()
+
+PREVIEW_PREFETCH = 3
+SEQUENCE_TTL_SECONDS = 604800
+_LAST_PREVIEW: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+_LAST_PREVIEW_LOCK = threading.Lock()
 
+
+def single_flight(file_path: str, fetch: Callable[[], str]) -> str:
     if os.path.isfile(file_path):
         return file_path
 
+    with _IN_FLIGHT_LOCK:
+        in_flight = _IN_FLIGHT.get(file_path)
+        if in_flight is None:
+            _IN_FLIGHT[file_path] = future = Future()
+    if in_flight is not None:
+        return in_flight.result()
+
+    try:
+        result = fetch()
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _IN_FLIGHT_LOCK:
+            _IN_FLIGHT.pop(file_path, None)
+
+
+def write_atomic(file_path: str, data: bytes) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def thumbnail_folder() -> str:
+    return os.path.join(get_cache_path(), "picpocket/thumbnail")
+
+
+def thumbnail_path(image_id: str) -> str:
+    return os.path.join(thumbnail_folder(), f"{image_id}.webp")
+
+
+def download_thumbnail(url: str, token: str, image_id: str) -> str:
+    file_path = thumbnail_path(image_id)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    return single_flight(file_path, lambda: _fetch_thumbnail(url, token, image_id, file_path))
+
+
+def _fetch_thumbnail(url: str, token: str, image_id: str, file_path: str) -> str:
     response = http.get(
         url=api_url(url, f"/api/assets/{image_id}/thumbnail"),
         headers={"Authorization": f"Bearer {token}"},
         params={"size": "thumbnail"},
+        compress=False,
     )
     if response.status_code >= 300:
         return ""
 
     data = response.data
     if is_webp(data):
-        with open(file_path, "wb+") as f:
-            f.write(data)
+        write_atomic(file_path, data)
     return file_path
 
 
@@ -68,18 +143,18 @@ def download_photo_preview(url: str, token: str, image_id: str) -> str:
     base_folder = os.path.join(get_cache_path(), "picpocket/preview/photo")
     os.makedirs(base_folder, exist_ok=True)
     file_path = os.path.join(base_folder, f"{image_id}.jpeg")
+    return single_flight(file_path, lambda: _fetch_photo_preview(url, token, image_id, file_path))
 
-    if os.path.isfile(file_path):
-        return file_path
 
+def _fetch_photo_preview(url: str, token: str, image_id: str, file_path: str) -> str:
     response = http.get(
         url=api_url(url, f"/api/assets/{image_id}/thumbnail"),
         headers={"Authorization": f"Bearer {token}"},
         params={"size": "preview"},
+        compress=False,
     )
     response.raise_for_status()
-    with open(file_path, "wb+") as f:
-        f.write(response.data)
+    write_atomic(file_path, response.data)
     return file_path
 
 
@@ -87,18 +162,16 @@ def download_video_preview(url: str, token: str, video_id: str) -> str:
     base_folder = os.path.join(get_cache_path(), "picpocket/preview/video")
     os.makedirs(base_folder, exist_ok=True)
     file_path = os.path.join(base_folder, f"{video_id}.mp4")
+    return single_flight(file_path, lambda: _fetch_video_preview(url, token, video_id, file_path))
 
-    if os.path.isfile(file_path):
-        return file_path
 
-    response = http.get(
+def _fetch_video_preview(url: str, token: str, video_id: str, file_path: str) -> str:
+    response = http.download(
         url=api_url(url, f"/api/assets/{video_id}/video/playback"),
+        file_path=file_path,
         headers={"Authorization": f"Bearer {token}"},
     )
     response.raise_for_status()
-    with open(file_path, "wb+") as f:
-        f.write(response.data)
-        f.flush()
     return file_path
 
 
@@ -125,17 +198,16 @@ def download_original(image_id: str) -> str:
     base_folder = os.path.join(get_cache_path(), "picpocket/original", image_id)
     os.makedirs(base_folder, exist_ok=True)
     file_path = os.path.join(base_folder, file_name)
+    return single_flight(file_path, lambda: _fetch_original(url, token, image_id, file_path))
 
-    if os.path.isfile(file_path):
-        return file_path
 
-    photo_response = http.get(
+def _fetch_original(url: str, token: str, image_id: str, file_path: str) -> str:
+    photo_response = http.download(
         url=api_url(url, f"/api/assets/{image_id}/original"),
+        file_path=file_path,
         headers={"Authorization": f"Bearer {token}"},
     )
     photo_response.raise_for_status()
-    with open(file_path, "wb+") as f:
-        f.write(photo_response.data)
 
     return file_path
 
@@ -167,21 +239,20 @@ def download_people_thumbnail(url: str, token: str, person_id: str) -> str:
     base_folder = os.path.join(get_cache_path(), "picpocket/person-thumbnail")
     os.makedirs(base_folder, exist_ok=True)
     file_path = os.path.join(base_folder, f"{person_id}.jpeg")
+    return single_flight(file_path, lambda: _fetch_people_thumbnail(url, token, person_id, file_path))
 
-    if os.path.isfile(file_path):
-        return file_path
 
+def _fetch_people_thumbnail(url: str, token: str, person_id: str, file_path: str) -> str:
     response = http.get(
         url=api_url(url, f"/api/people/{person_id}/thumbnail"),
         headers={"Authorization": f"Bearer {token}"},
+        compress=False,
     )
     if response.status_code == 404:
         return ""
 
     response.raise_for_status()
-    data = response.data
-    with open(file_path, "wb+") as f:
-        f.write(data)
+    write_atomic(file_path, response.data)
     return file_path
 
 
@@ -192,45 +263,65 @@ class Bucket:
     previous: str
 
 
-def get_bucket(url: str, token: str, current: str, query_params: Dict[str, str] = {}) -> Bucket:
+def save_sequence(kv: KV, prefix: str, page: str, ids: List[str]) -> None:
+    kv.put_cached(f"sequence.{prefix}.{page}", ids, ttl_seconds=SEQUENCE_TTL_SECONDS)
+
+
+def neighbours(ids: List[str], item: str) -> Tuple[Optional[str], Optional[str]]:
+    try:
+        position = ids.index(item)
+    except ValueError:
+        return None, None
+    previous = ids[position - 1] if position - 1 >= 0 else None
+    next_ = ids[position + 1] if position + 1 < len(ids) else None
+    return previous, next_
+
+
+def ahead(ids: List[str], item: str, direction: str, count: int) -> List[str]:
+    try:
+        position = ids.index(item)
+    except ValueError:
+        return []
+    if direction == "next":
+        return ids[position + 1 : position + 1 + count]
+    if direction == "previous":
+        return ids[max(0, position - count) : position][::-1]
+    return [x for x in neighbours(ids, item) if x]
+
+
+def get_bucket(url: str, token: str, current: str, query_params: Dict[str, str] = {}, tags: List[str] = []) -> Bucket:
     hashed_args = hash_function_args(query_params, {})
     with KV() as kv:
-        cached = kv.get(f"bucket.{hashed_args}.cached") or False
-        if cached:
-            if not current:
-                final_current = kv.get(f"bucket.{hashed_args}.first") or ""
-            else:
-                final_current = current
-            next_ = kv.get(f"bucket.{hashed_args}.{final_current}.next") or ""
-            previous = kv.get(f"bucket.{hashed_args}.{final_current}.previous") or ""
-            return Bucket(current=final_current, next=next_, previous=previous)
-        else:
+        time_buckets = kv.get(f"bucket.{hashed_args}")
+        if time_buckets is None:
+            previous = kv.get(f"bucket_validator.{hashed_args}")
             response = http.get(
                 url=api_url(url, "/api/timeline/buckets"),
                 headers={"Authorization": f"Bearer {token}"},
                 params=query_params,
+                validator=previous["validator"] if previous else None,
             )
-            response.raise_for_status()
-            json_response = response.json()
-            time_buckets = [x.get("timeBucket") for x in json_response]
-
-            first = ""
-            for i, bucket in enumerate(time_buckets):
-                if i == 0:
-                    kv.put_cached(f"bucket.{hashed_args}.first", bucket, ttl_seconds=3600)
-                    first = bucket
-                next_ = time_buckets[i - 1] if i - 1 >= 0 else ""
-                previous = time_buckets[i + 1] if i + 1 < len(time_buckets) else ""
-
-                kv.put_cached(f"bucket.{hashed_args}.{bucket}.next", next_, ttl_seconds=3600)
-                kv.put_cached(f"bucket.{hashed_args}.{bucket}.previous", previous, ttl_seconds=3600)
-            kv.put_cached(f"bucket.{hashed_args}.cached", True, ttl_seconds=3600)
-            kv.commit_cached()
-            if not current:
-                final_current = first
+            if previous and response.status_code == 304:
+                time_buckets = previous["buckets"]
             else:
-                final_current = current
-            return get_bucket(url, token, current=final_current, query_params=query_params)
+                response.raise_for_status()
+                json_response = response.json()
+                time_buckets = [x.get("timeBucket") for x in json_response]
+                if response.validator:
+                    kv.put(
+                        f"bucket_validator.{hashed_args}",
+                        {"validator": response.validator, "buckets": time_buckets},
+                        ttl_seconds=604800,
+                        tags=["buckets", *tags],
+                    )
+            kv.put(f"bucket.{hashed_args}", time_buckets, ttl_seconds=3600, tags=["buckets", *tags])
+
+    if not current:
+        final_current = time_buckets[0] if time_buckets else ""
+    else:
+        final_current = current
+    newer, older = neighbours(time_buckets, final_current)
+    return Bucket(current=final_current, next=newer or "", previous=older or "")
 
 
 def delete_buckets():
@@ -250,6 +341,27 @@ def parse_duration(duration: Optional[int]) -> Optional[str]:
     return f"{minutes}:{seconds:02d}"
 
 
+def bucket_months(created_at: str) -> List[str]:
+    # Buckets are local-time months but fileCreatedAt is UTC, so an asset near a
+    # month boundary may sit in the neighbouring month. UTC offsets stay within 14h.
+    created = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+    shift = timedelta(hours=14)
+    return sorted({(created - shift).strftime("%Y-%m"), (created + shift).strftime("%Y-%m")})
+
+
+def day_titles(file_created_ats: List[Optional[str]]) -> List[str]:
+    memo: Dict[str, str] = {}
+    titles = []
+    for created_at in file_created_ats:
+        day = created_at[:10] if created_at else ""
+        title = memo.get(day)
+        if title is None:
+            title = datetime.fromisoformat(day).strftime("%B, %d, %Y") if day[8:10] else ""
+            memo[day] = title
+        titles.append(title)
+    return titles
+
+
 @dataclass
 class Asset:
     id: str
@@ -292,15 +404,19 @@ def metadata_search(
 
     items = json_response.get("assets", {}).get("items", [])
     assets = []
+    records = []
     for item in items:
+        duration = parse_duration(item.get("duration"))
         assets.append(
             Asset(
                 id=item.get("id", ""),
-                duration=parse_duration(item.get("duration")),
+                duration=duration,
                 title=item.get("originalFileName", ""),
                 created_at=item.get("fileCreatedAt", ""),
             )
         )
+        records.append(asset_from_json(item, duration))
+    upsert_assets(records)
     return SearchResponse(assets=assets, next=next_page, previous=previous_page)
 
 
@@ -322,15 +438,19 @@ def smart_search(url: str, token: str, query: str, page: str = "") -> SearchResp
 
     items = json_response.get("assets", {}).get("items", [])
     assets = []
+    records = []
     for item in items:
+        duration = parse_duration(item.get("duration"))
         assets.append(
             Asset(
                 id=item.get("id", ""),
-                duration=parse_duration(item.get("duration")),
+                duration=duration,
                 title=item.get("originalFileName", ""),
                 created_at=item.get("fileCreatedAt", ""),
             )
         )
+        records.append(asset_from_json(item, duration))
+    upsert_assets(records)
     return SearchResponse(assets=assets, next=next_page, previous=previous_page)
 
 
@@ -348,60 +468,90 @@ class AssetInfo:
     favorite: bool
     archived: bool
     deleted: bool
+    previous: Optional[str] = None
+    next: Optional[str] = None
 
 
-def asset_info(image_id: str) -> AssetInfo:
+def asset_record(url: str, token: str, image_id: str) -> AssetRecord:
+    record = get_asset(image_id)
+    if not record or not record.complete:
+        metadata_response = http.get(
+            api_url(url, f"/api/assets/{image_id}"),
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        metadata_response.raise_for_status()
+        json_response = metadata_response.json()
+        record = asset_from_json(json_response, parse_duration(json_response.get("duration")))
+        record.id = image_id
+        record.name = record.name or ""
+        record.type = record.type or "IMAGE"
+        record.favorite = bool(record.favorite)
+        record.archived = bool(record.archived)
+        record.trashed = bool(record.trashed)
+        upsert_assets([record])
+    return record
+
+
+def prefetch_preview(url: str, token: str, image_id: str) -> None:
+    record = asset_record(url, token, image_id)
+    if record.type != "VIDEO":
+        download_photo_preview(url, token, image_id)
+
+
+def swipe_direction(neighbours_prefix: str, image_id: str) -> str:
+    with _LAST_PREVIEW_LOCK:
+        previous, next_ = _LAST_PREVIEW.get(neighbours_prefix, (None, None))
+    if image_id == next_:
+        return "next"
+    if image_id == previous:
+        return "previous"
+    return ""
+
+
+def asset_info(image_id: str, neighbours_prefix: str = "", page: str = "") -> AssetInfo:
+    sequence_key = f"sequence.{neighbours_prefix}.{page}"
     with KV() as kv:
-        url = kv.get("immich.url")
-        token = kv.get("immich.token")
-
-        if not url or not token:
-            raise ValueError("Missing URL or token")
-
-        file_name = kv.get(f"asset_info.{image_id}.name")
-        file_type = kv.get(f"asset_info.{image_id}.type")
-        favorite = kv.get(f"asset_info.{image_id}.favorite")
-        archived = kv.get(f"asset_info.{image_id}.archived")
-        deleted = kv.get(f"asset_info.{image_id}.deleted")
-
-        if not file_name or not file_type or favorite is None or archived is None or deleted is None:
-            metadata_response = http.get(
-                api_url(url, f"/api/assets/{image_id}"),
-                headers={"Authorization": f"Bearer {token}"},
+        values = kv.get_many(["immich.url", "immich.token", sequence_key])
+    sequence = values.get(sequence_key) or [] if neighbours_prefix else []
+    previous, next_ = neighbours(sequence, image_id)
+    url = values.get("immich.url")
+    token = values.get("immich.token")
+
+    if not url or not token:
+        raise ValueError("Missing URL or token")
+
+    get_download_scheduler().cancel_group("preview.prefetch")
+    if neighbours_prefix:
+        direction = swipe_direction(neighbours_prefix, image_id)
+        with _LAST_PREVIEW_LOCK:
+            _LAST_PREVIEW[neighbours_prefix] = (previous, next_)
+        count = PREVIEW_PREFETCH if direction else 1
+        for neighbour_id in ahead(sequence, image_id, direction, count):
+            submit_download(
+                url, "preview.prefetch", prefetch_preview, url, token, neighbour_id, priority=Priority.PREFETCH
             )
-            metadata_response.raise_for_status()
-            json_response = metadata_response.json()
-            file_name = json_response.get("originalFileName", "")
-            file_type = json_response.get("type", "IMAGE")
-            favorite = json_response.get("isFavorite", False)
-            archived = json_response.get("isArchived", False)
-            deleted = json_response.get("isTrashed", False)
-
-            kv.put_cached(f"asset_info.{image_id}.name", file_name, ttl_seconds=300)
-            kv.put_cached(f"asset_info.{image_id}.type", file_type, ttl_seconds=300)
-            kv.put_cached(f"asset_info.{image_id}.favorite", favorite, ttl_seconds=300)
-            kv.put_cached(f"asset_info.{image_id}.archived", archived, ttl_seconds=300)
-            kv.put_cached(f"asset_info.{image_id}.deleted", deleted, ttl_seconds=300)
-            kv.commit_cached()
-
-        if file_type == "VIDEO":
-            file_type_enum = FileType.VIDEO
-            file_path = download_video_preview(url, token, image_id)
-        else:
-            file_type_enum = FileType.IMAGE
-            file_path = download_photo_preview(url, token, image_id)
-
-        return AssetInfo(
-            file_path=file_path,
-            id=image_id,
-            name=file_name,
-            file_type=file_type_enum,
-            favorite=favorite,
-            archived=archived,
-            deleted=deleted,
-        )
+
+    record = asset_record(url, token, image_id)
+    if record.type == "VIDEO":
+        file_type_enum = FileType.VIDEO
+        download = download_video_preview
+    else:
+        file_type_enum = FileType.IMAGE
+        download = download_photo_preview
+    file_path = submit_download(url, "preview", download, url, token, image_id, priority=Priority.PREVIEW).result()
+
+    return AssetInfo(
+        file_path=file_path,
+        id=image_id,
+        name=record.name or "",
+        file_type=file_type_enum,
+        favorite=bool(record.favorite),
+        archived=bool(record.archived),
+        deleted=bool(record.trashed),
+        previous=previous,
+        next=next_,
+    )
 
 
 def delete_asset_info():
-    with KV() as kv:
-        kv.delete_partial("asset_info")
+    delete_assets()
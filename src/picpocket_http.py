@@ -14,13 +14,17 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import urllib.parse
 from typing import Dict, Optional
 
 from src.ut_components import http as ut_http
+from src.ut_components.memoize import memoized_validator, save_memoized_validator
 
 USER_AGENT = "Picpocket (Ubuntu Touch; Linux; Immich client; +https://git.brennoflavio.com.br/brennoflavio/picpocket)"
 Response = ut_http.Response
 
+ut_http.configure_connection_pool(max_size=16)
+
 
 def _headers(headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
     request_headers = dict(headers or {})
@@ -35,6 +39,7 @@ def request(
     headers: Optional[Dict[str, str]] = None,
     follow_redirects: bool = True,
     max_redirects: int = 10,
+    compress: bool = True,
 ) -> ut_http.Response:
     return ut_http.request(
         url=url,
@@ -43,6 +48,7 @@ def request(
         headers=_headers(headers),
         follow_redirects=follow_redirects,
         max_redirects=max_redirects,
+        compress=compress,
     )
 
 
@@ -50,8 +56,24 @@ def get(
     url: str,
     headers: Optional[Dict[str, str]] = None,
     params: Optional[Dict[str, str]] = None,
+    validator: Optional[str] = None,
+    revalidate: bool = False,
+    compress: bool = True,
 ) -> ut_http.Response:
-    return ut_http.get(url=url, headers=_headers(headers), params=params)
+    if not revalidate:
+        return ut_http.get(url=url, headers=_headers(headers), params=params, validator=validator, compress=compress)
+
+    name = f"{url}?{urllib.parse.urlencode(params or {})}"
+    response = ut_http.get(
+        url=url,
+        headers=_headers(headers),
+        params=params,
+        validator=memoized_validator(name),
+        compress=compress,
+    )
+    if response.success:
+        save_memoized_validator(name, response.validator)
+    return response
 
 
 def post(url: str, json: Optional[Dict] = None, headers: Optional[Dict[str, str]] = None) -> ut_http.Response:
@@ -82,3 +104,7 @@ def post_file(
         form_fields=form_fields,
         headers=_headers(headers),
     )
+
+
+def download(url: str, file_path: str, headers: Optional[Dict[str, str]] = None) -> ut_http.Response:
+    return ut_http.download(url=url, file_path=file_path, headers=_headers(headers))
@@ -16,6 +16,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import functools
 import traceback
+from concurrent.futures import CancelledError
 from typing import Any, Callable
 
 from . import CRASH_REPORT_URL_, http
@@ -91,7 +92,9 @@ def crash_reporter(func: Callable) -> Callable:
 
     The decorator checks if crash reporting is enabled before sending any data, respecting
     user privacy preferences. It requires the library to be initialized with a valid
-    crash report URL using the setup() function.
+    crash report URL using the setup() function. http.NotModified and CancelledError
+    are not crashes: they signal a successful revalidation to memoize() and a
+    download cancelled with the scheduler, and are re-raised untouched.
 
     Args:
         func (Callable): The function to be decorated with crash reporting capability.
@@ -136,6 +139,8 @@ def crash_reporter(func: Callable) -> Callable:
     def wrapper(*args, **kwargs) -> Any:
         try:
             return func(*args, **kwargs)
+        except (http.NotModified, CancelledError):
+            raise
         except Exception:
             if get_crash_report():
                 assert CRASH_REPORT_URL_
@@ -27,6 +27,7 @@ from typing import Dict, List, Optional, Tuple, Union
 
 import pyotherside
 
+from .kv import KV
 from .utils import enum_to_str
 
 EVENT_DISPATCHER = None
@@ -160,6 +161,52 @@ class ErrorEvent(Event):
         return metadata
 
 
+class KVSweepEvent(Event):
+    """
+    Periodic event that removes expired KV entries and compacts the database.
+
+    Expired entries are filtered out on read but stay in kv.db until they
+    are deleted. Registering this event keeps the database small: each run
+    deletes expired rows in bounded batches and, once enough space is free,
+    vacuums the file. Nothing is sent to QML.
+
+    Attributes:
+        batch_size (int): Rows deleted per transaction.
+        max_batches (Optional[int]): Maximum batches per run, so a single run
+            never holds the dispatcher for long.
+        vacuum_threshold_bytes (Optional[int]): Free space that triggers a
+            vacuum. None disables compaction.
+
+    Example:
+        >>> from datetime import timedelta
+        >>> from src.ut_components.event import KVSweepEvent, get_event_dispatcher
+        >>>
+        >>> get_event_dispatcher().register_event(
+        ...     KVSweepEvent(id="kv-sweep", execution_interval=timedelta(minutes=15))
+        ... )
+        >>> get_event_dispatcher().start()
+    """
+
+    def __init__(
+        self,
+        id: str,
+        execution_interval: Optional[timedelta] = None,
+        batch_size: int = 500,
+        max_batches: Optional[int] = 20,
+        vacuum_threshold_bytes: Optional[int] = 8388608,
+    ) -> None:
+        super().__init__(id, execution_interval)
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.vacuum_threshold_bytes = vacuum_threshold_bytes
+
+    def trigger(self, metadata: Optional[Dict]) -> None:
+        with KV() as kv:
+            kv.delete_expired(batch_size=self.batch_size, max_batches=self.max_batches)
+            if self.vacuum_threshold_bytes is not None:
+                kv.compact(min_free_bytes=self.vacuum_threshold_bytes)
+
+
 @dataclass
 class QueuedEvent:
     """
@@ -204,6 +251,7 @@ class EventDispatcher:
         - Exception handling to prevent individual event failures from
           crashing the dispatcher
         - Background thread execution with start() and stop() methods
+        - Events can be scheduled safely from any thread
 
     Note:
         Do not instantiate EventDispatcher directly. Use the
@@ -277,6 +325,7 @@ class EventDispatcher:
         self._counter: int = 0
         self._running: bool = False
         self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
 
     def register_event(self, event: Event) -> str:
         """
@@ -389,30 +438,30 @@ class EventDispatcher:
             execution_date = datetime.now()
 
         heap_key = self._heap_key(execution_date)
-        heapq.heappush(self._queue, (heap_key, self._counter, queued_event))
-        self._counter += 1
+        with self._lock:
+            heapq.heappush(self._queue, (heap_key, self._counter, queued_event))
+            self._counter += 1
 
     def _enqueue(self):
-        for event in self._events.values():
+        for event in list(self._events.values()):
             if event.execution_interval:
                 if not event.next_execution_date or event.next_execution_date < datetime.now():
                     event.next_execution_date = datetime.now() + event.execution_interval
                     self.schedule(event.id)
 
     def _process(self):
-        while self._queue:
-            heap_key, counter, queued_event = heapq.heappop(self._queue)
-            if heap_key <= self._heap_key(datetime.now()):
-                result = queued_event.event.trigger(queued_event.metadata)
-                if result:
-                    if is_dataclass(result):
-                        dict_result: Dict = enum_to_str(asdict(result))  # type: ignore
-                    else:
-                        dict_result = result  # type: ignore
-                    pyotherside.send(queued_event.event.id, dict_result)
-            else:
-                heapq.heappush(self._queue, (heap_key, counter, queued_event))
-                break
+        while True:
+            with self._lock:
+                if not self._queue or self._queue[0][0] > self._heap_key(datetime.now()):
+                    break
+                _, _, queued_event = heapq.heappop(self._queue)
+            result = queued_event.event.trigger(queued_event.metadata)
+            if result:
+                if is_dataclass(result):
+                    dict_result: Dict = enum_to_str(asdict(result))  # type: ignore
+                else:
+                    dict_result = result  # type: ignore
+                pyotherside.send(queued_event.event.id, dict_result)
 
     def _run(self, interval_seconds: float = 0.5):
         self.register_event(ErrorEvent(id="error-event"))
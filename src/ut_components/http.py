@@ -14,30 +14,599 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import email.utils
+import http.client
+import io
 import json as json_
-import urllib.error
+import os
+import random
+import socket
+import ssl
+import threading
+import time
 import urllib.parse
-import urllib.request
-from typing import Dict, Optional
+import zlib
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Deque, Dict, List, Optional, Tuple
 
 from .mimetypes import guess_type
 
+try:
+    import brotli as _brotli
+except ImportError:
+    _brotli = None
+
+_PoolKey = Tuple[str, str, int]
+_Timeout = Tuple[Optional[float], Optional[float]]
+
+_IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "PUT", "DELETE", "OPTIONS"))
+_RETRY_STATUS_CODES = frozenset((429, 500, 502, 503, 504))
+_SEND_BLOCK_SIZE = 65536
+
+
+class _ConnectionPool:
+    def __init__(self, max_size: int, idle_timeout: float) -> None:
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._idle: Dict[_PoolKey, List[Tuple[http.client.HTTPConnection, float]]] = {}
+        self._lock = threading.Lock()
+        self._ssl_context: Optional[ssl.SSLContext] = None
+
+    def acquire(self, key: _PoolKey) -> Tuple[http.client.HTTPConnection, bool]:
+        conn = None
+        with self._lock:
+            now = time.monotonic()
+            idle = self._idle.get(key, [])
+            expired = [candidate for candidate, released_at in idle if now - released_at >= self.idle_timeout]
+            idle = [
+                (candidate, released_at) for candidate, released_at in idle if now - released_at < self.idle_timeout
+            ]
+            if idle:
+                conn = idle.pop()[0]
+            self._idle[key] = idle
+            if self._ssl_context is None and key[0] == "https":
+                self._ssl_context = ssl.create_default_context()
+        for candidate in expired:
+            candidate.close()
+        if conn is not None:
+            return conn, True
+
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, context=self._ssl_context), False
+        return http.client.HTTPConnection(host, port), False
+
+    def release(self, key: _PoolKey, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_size:
+                idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def configure(self, max_size: Optional[int], idle_timeout: Optional[float]) -> None:
+        with self._lock:
+            if max_size is not None:
+                self.max_size = max_size
+            if idle_timeout is not None:
+                self.idle_timeout = idle_timeout
+            closing = []
+            for idle in self._idle.values():
+                while len(idle) > self.max_size:
+                    closing.append(idle.pop(0)[0])
+        for conn in closing:
+            conn.close()
+
+    def clear(self) -> None:
+        with self._lock:
+            closing = [conn for idle in self._idle.values() for conn, _ in idle]
+            self._idle.clear()
+        for conn in closing:
+            conn.close()
+
+
+_POOL = _ConnectionPool(max_size=10, idle_timeout=60.0)
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class _RetryPolicy:
+    def __init__(self, max_retries: int, backoff_factor: float, max_backoff: float) -> None:
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+
+    def delay(self, attempt: int, response: "Response") -> Optional[float]:
+        if attempt >= self.max_retries:
+            return None
+        if response.error is not None:
+            if not isinstance(response.error, (OSError, http.client.HTTPException)):
+                return None
+            if isinstance(response.error, ssl.SSLCertVerificationError):
+                return None
+        elif response.status_code not in _RETRY_STATUS_CODES:
+            return None
+
+        backoff = random.uniform(0, min(self.max_backoff, self.backoff_factor * 2**attempt))
+        retry_after = _retry_after(response.headers.get("Retry-After"))
+        if retry_after is None:
+            return backoff
+        if retry_after > self.max_backoff:
+            return None
+        return max(backoff, retry_after)
+
+
+class _Stats:
+    def __init__(self, window: int) -> None:
+        self._lock = threading.Lock()
+        self._window = window
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.retries = 0
+            self.failures = 0
+            self.retry_reasons: Dict[str, int] = {}
+            self.latencies: Deque[float] = deque(maxlen=self._window)
+
+    def record(self, latency: float, response: "Response") -> None:
+        with self._lock:
+            self.requests += 1
+            self.latencies.append(latency)
+            if response.status_code == 0 or response.status_code >= 400:
+                self.failures += 1
+
+    def record_retry(self, response: "Response") -> None:
+        reason = type(response.error).__name__ if response.error is not None else str(response.status_code)
+        with self._lock:
+            self.retries += 1
+            self.retry_reasons[reason] = self.retry_reasons.get(reason, 0) + 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            latencies = sorted(self.latencies)
+            result = {
+                "requests": self.requests,
+                "retries": self.retries,
+                "failures": self.failures,
+                "retry_reasons": dict(self.retry_reasons),
+            }
+        count = len(latencies)
+        result["latency_ms"] = {
+            "count": count,
+            "mean": round(sum(latencies) / count * 1000, 1) if count else 0.0,
+            "p50": round(latencies[count // 2] * 1000, 1) if count else 0.0,
+            "p95": round(latencies[min(count - 1, count * 95 // 100)] * 1000, 1) if count else 0.0,
+            "max": round(latencies[-1] * 1000, 1) if count else 0.0,
+        }
+        return result
+
+
+_RETRY = _RetryPolicy(max_retries=3, backoff_factor=0.5, max_backoff=30.0)
+_TIMEOUT: _Timeout = (10.0, 30.0)
+_STATS = _Stats(window=1024)
+
+
+_PATH_LOCKS: Dict[str, List] = {}
+_PATH_LOCKS_LOCK = threading.Lock()
+
+
+def configure_connection_pool(max_size: Optional[int] = None, idle_timeout: Optional[float] = None) -> None:
+    """
+    Tune the pool of persistent connections used by all requests.
+
+    Requests reuse open HTTP/1.1 keep-alive connections to the same scheme,
+    host and port instead of paying a new TCP and TLS handshake every time.
+    A connection is used by one request at a time and returned to the pool
+    afterwards, so the pool is safe to use from many threads. Only the
+    arguments that are passed are changed.
+
+    Args:
+        max_size (Optional[int]): Maximum number of idle connections kept
+            per host. Threads that find no idle connection open a new one,
+            and connections above the limit are closed when released.
+            Defaults to 10. Use 0 to disable connection reuse.
+        idle_timeout (Optional[float]): Seconds an idle connection is kept
+            before it is closed instead of reused. Defaults to 60.
+
+    Example:
+        >>> from src.ut_components.http import configure_connection_pool
+        >>>
+        >>> # Keep more connections for parallel thumbnail downloads
+        >>> configure_connection_pool(max_size=16, idle_timeout=30)
+    """
+    _POOL.configure(max_size, idle_timeout)
+
+
+def close_connections() -> None:
+    """
+    Close every idle pooled connection.
+
+    Useful when the network changes or the server address is replaced.
+    Connections currently serving a request are closed when released if
+    the pool is full, and otherwise reused as usual.
+
+    Example:
+        >>> from src.ut_components.http import close_connections
+        >>>
+        >>> close_connections()
+    """
+    _POOL.clear()
+
+
+def configure_retries(
+    max_retries: Optional[int] = None,
+    backoff_factor: Optional[float] = None,
+    max_backoff: Optional[float] = None,
+) -> None:
+    """
+    Tune how failed requests are retried.
+
+    Requests with idempotent methods (GET, HEAD, PUT, DELETE and OPTIONS)
+    and download() are sent again when the connection fails or times out,
+    or when the server answers 429, 500, 502, 503 or 504. Before each retry
+    the request waits a random time between zero and
+    backoff_factor * 2 ** attempt seconds (full jitter), capped at
+    max_backoff, so many clients failing together do not come back in
+    lockstep. A Retry-After header is honoured as the minimum wait; if it
+    asks for more than max_backoff, the response is returned without
+    retrying. POST requests are never retried. Only the arguments that are
+    passed are changed.
+
+    Args:
+        max_retries (Optional[int]): Retries after the first attempt.
+            Defaults to 3. Use 0 to disable retries.
+        backoff_factor (Optional[float]): Base of the exponential backoff, in
+            seconds. Defaults to 0.5.
+        max_backoff (Optional[float]): Longest wait before a retry, in
+            seconds. Defaults to 30.
+
+    Example:
+        >>> from src.ut_components.http import configure_retries
+        >>>
+        >>> # Fail fast on a metered connection
+        >>> configure_retries(max_retries=1, max_backoff=5)
+    """
+    if max_retries is not None:
+        _RETRY.max_retries = max_retries
+    if backoff_factor is not None:
+        _RETRY.backoff_factor = backoff_factor
+    if max_backoff is not None:
+        _RETRY.max_backoff = max_backoff
+
+
+def configure_timeouts(connect_timeout: Optional[float] = None, read_timeout: Optional[float] = None) -> None:
+    """
+    Set the default timeouts of every request.
+
+    The connect timeout bounds opening the TCP connection and the TLS
+    handshake. The read timeout bounds each wait for the server while
+    sending the request body and reading the response, so a stalled
+    transfer fails (and is retried, see configure_retries()) instead of
+    blocking its thread forever. Requests can override both with their
+    timeout argument. Only the arguments that are passed are changed.
+
+    Args:
+        connect_timeout (Optional[float]): Seconds to wait for a connection.
+            Defaults to 10.
+        read_timeout (Optional[float]): Seconds to wait for the server
+            between reads or writes. Defaults to 30.
+
+    Example:
+        >>> from src.ut_components.http import configure_timeouts
+        >>>
+        >>> configure_timeouts(connect_timeout=5, read_timeout=20)
+    """
+    global _TIMEOUT
+    _TIMEOUT = (
+        connect_timeout if connect_timeout is not None else _TIMEOUT[0],
+        read_timeout if read_timeout is not None else _TIMEOUT[1],
+    )
+
+
+def get_stats() -> Dict:
+    """
+    Return request, retry and latency counters for tuning.
+
+    Every attempt of every request is counted, including retries and the
+    attempts of download(). Latencies cover the last 1024 attempts, from
+    sending the request until the body has been read, and are reported in
+    milliseconds. Failures are attempts that ended with a network error or
+    a status code of 400 or above. retry_reasons maps the status code or
+    exception name that caused a retry to how many times it happened.
+
+    Returns:
+        Dict: A snapshot like {"requests": 120, "retries": 3, "failures": 4,
+            "retry_reasons": {"503": 2, "TimeoutError": 1},
+            "latency_ms": {"count": 120, "mean": 85.2, "p50": 41.0,
+            "p95": 310.5, "max": 1200.3}}.
+
+    Example:
+        >>> from src.ut_components.http import get_stats
+        >>>
+        >>> stats = get_stats()
+        >>> print(f"{stats['retries']} retries, p95 {stats['latency_ms']['p95']} ms")
+    """
+    return _STATS.snapshot()
+
+
+def reset_stats() -> None:
+    """
+    Reset the counters returned by get_stats().
+
+    Example:
+        >>> from src.ut_components.http import get_stats, reset_stats
+        >>>
+        >>> reset_stats()
+        >>> load_timeline()
+        >>> print(get_stats()["latency_ms"])
+    """
+    _STATS.reset()
+
+
+class _DeflateDecoder:
+    def __init__(self) -> None:
+        self._decoder = zlib.decompressobj()
+        self._started = False
+
+    def decompress(self, data: bytes) -> bytes:
+        if not self._started and data:
+            self._started = True
+            try:
+                return self._decoder.decompress(data)
+            except zlib.error:
+                # Some servers send raw deflate without the zlib header.
+                self._decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+        return self._decoder.decompress(data)
+
+    def flush(self) -> bytes:
+        return self._decoder.flush()
+
+
+class _BrotliDecoder:
+    def __init__(self) -> None:
+        self._decoder = _brotli.Decompressor()
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decoder.process(data)
+
+    def flush(self) -> bytes:
+        return b""
+
+
+_DECODERS: Dict[str, Callable] = {
+    "gzip": lambda: zlib.decompressobj(16 + zlib.MAX_WBITS),
+    "x-gzip": lambda: zlib.decompressobj(16 + zlib.MAX_WBITS),
+    "deflate": _DeflateDecoder,
+}
+if _brotli is not None:
+    _DECODERS["br"] = _BrotliDecoder
+_ACCEPT_ENCODING = ", ".join(encoding for encoding in ("br", "gzip", "deflate") if encoding in _DECODERS)
+_DECODE_CHUNK_SIZE = 65536
+
+
+def _read_body(response: http.client.HTTPResponse, compress: bool) -> bytes:
+    encoding = (response.headers.get("Content-Encoding") or "").strip().lower()
+    factory = _DECODERS.get(encoding) if compress else None
+    if factory is None:
+        return response.read()
+
+    decoder = factory()
+    chunks = []
+    while True:
+        chunk = response.read(_DECODE_CHUNK_SIZE)
+        if not chunk:
+            break
+        chunks.append(decoder.decompress(chunk))
+    if response.length:
+        raise http.client.IncompleteRead(b"", response.length)
+    chunks.append(decoder.flush())
+    return b"".join(chunks)
+
+
+def _open(
+    url: str, method: str, data: Optional[bytes], headers: Dict[str, str], timeout: _Timeout
+) -> Tuple[_PoolKey, http.client.HTTPConnection, http.client.HTTPResponse]:
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError(f"unsupported url {url}")
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    key = (parts.scheme, parts.hostname, port)
+    path = parts.path or "/"
+    if parts.query:
+        path = f"{path}?{parts.query}"
+
+    # Large bodies are sent in blocks, so the read timeout applies to each
+    # block instead of to the whole upload.
+    streamed = data is not None and len(data) > _SEND_BLOCK_SIZE
+    if streamed and not any(name.lower() == "content-length" for name in headers):
+        headers = {**headers, "Content-Length": str(len(data))}
+
+    idempotent = method.upper() in _IDEMPOTENT_METHODS
+    while True:
+        conn, reused = _POOL.acquire(key)
+        sent = False
+        try:
+            if not reused:
+                conn.timeout = timeout[0]
+                conn.connect()
+                conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            conn.sock.settimeout(timeout[1])
+            body = io.BytesIO(data) if streamed else data
+            conn.request(method, path, body=body, headers=headers)
+            sent = True
+            return key, conn, conn.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            conn.close()
+            # The server may close an idle connection just as it is reused. Once
+            # the request was fully written it may also have been processed, so
+            # only idempotent requests are sent again after that point.
+            if reused and (not sent or idempotent):
+                continue
+            raise
+        except BaseException:
+            conn.close()
+            raise
+
+
+def _perform(
+    url: str,
+    method: str,
+    data: Optional[bytes],
+    headers: Dict[str, str],
+    follow_redirects: bool,
+    max_redirects: int,
+    consume: Optional[Callable[[http.client.HTTPResponse], bytes]] = None,
+    compress: bool = False,
+    timeout: Optional[_Timeout] = None,
+) -> "Response":
+    if compress and not any(name.lower() == "accept-encoding" for name in headers):
+        headers = {**headers, "Accept-Encoding": _ACCEPT_ENCODING}
+
+    # download() resumes on its own, so streamed bodies are not retried here.
+    retries = consume is None and method.upper() in _IDEMPOTENT_METHODS
+    attempt = 0
+    while True:
+        started = time.monotonic()
+        response = _perform_once(
+            url, method, data, headers, follow_redirects, max_redirects, consume, compress, timeout or _TIMEOUT
+        )
+        _STATS.record(time.monotonic() - started, response)
+        delay = _RETRY.delay(attempt, response) if retries else None
+        if delay is None:
+            return response
+        _STATS.record_retry(response)
+        attempt += 1
+        time.sleep(delay)
+
+
+def _perform_once(
+    url: str,
+    method: str,
+    data: Optional[bytes],
+    headers: Dict[str, str],
+    follow_redirects: bool,
+    max_redirects: int,
+    consume: Optional[Callable[[http.client.HTTPResponse], bytes]],
+    compress: bool,
+    timeout: _Timeout,
+) -> "Response":
+    redirect_count = 0
+    current_url = url
+    current_method = method
+    current_data = data
+
+    while redirect_count < max_redirects:
+        try:
+            key, conn, response = _open(current_url, current_method, current_data, headers, timeout)
+            try:
+                status_code = response.status
+                if consume is not None and 200 <= status_code < 300:
+                    body = consume(response)
+                else:
+                    body = _read_body(response, compress)
+            except BaseException:
+                conn.close()
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                _POOL.release(key, conn)
+        except Exception as e:
+            return Response(url=current_url, success=False, status_code=0, data=str(e).encode(), error=e)
+
+        if follow_redirects and status_code in (301, 302, 303, 307, 308):
+            redirect_count += 1
+            location = response.headers.get("Location")
+            if not location:
+                return Response(url=current_url, success=False, status_code=status_code, data=body)
+
+            if not location.startswith(("http://", "https://")):
+                location = urllib.parse.urljoin(current_url, location)
+
+            current_url = location
+
+            if status_code == 303 or (status_code in (301, 302) and current_method in ("POST", "PUT", "DELETE")):
+                current_method = "GET"
+                current_data = None
+
+            continue
+
+        return Response(
+            url=current_url,
+            success=200 <= status_code < 300,
+            status_code=status_code,
+            data=body,
+            headers=response.headers,
+        )
+
+    return Response(
+        url=current_url,
+        success=False,
+        status_code=0,
+        data=b"Maximum redirects exceeded",
+    )
+
+
+class NotModified(ValueError):
+    """
+    Raised by Response.raise_for_status() for a 304 Not Modified response.
+
+    A 304 only comes back for conditional requests (see the validator
+    argument of get()), and means the copy the caller already has is still
+    current. It subclasses ValueError so existing error handling keeps
+    working, while callers that revalidate can catch it on its own.
+
+    Example:
+        >>> from src.ut_components.http import NotModified, get
+        >>>
+        >>> response = get("https://api.example.com/albums", validator=etag)
+        >>> try:
+        ...     response.raise_for_status()
+        ...     albums = response.json()
+        ... except NotModified:
+        ...     albums = cached_albums
+    """
+
 
 class Response:
     """
     HTTP Response wrapper for handling API responses in Ubuntu Touch applications.
 
     This class provides a convenient interface for working with HTTP responses,
-    including automatic text decoding, JSON parsing, and status validation.
+    including lazy text decoding, JSON parsing, and status validation.
     It encapsulates the response data and provides utility methods for common
     operations like checking for errors or parsing JSON content.
 
     Attributes:
         url (str): The URL that was requested.
-        success (bool): Whether the request completed without network errors.
+        success (bool): Whether the request completed with a 2xx status code.
         status_code (int): HTTP status code (200, 404, etc.). 0 for network errors.
         data (bytes): Raw response body as bytes.
-        text (str): Response body decoded as UTF-8 string.
+        headers (Dict[str, str]): Response headers, with case-insensitive
+            lookups. Empty for network errors.
+        error (Optional[Exception]): The exception behind a network error
+            (status_code 0), such as a timeout. None otherwise.
+        validator (Optional[str]): The ETag or Last-Modified header, to be
+            passed back as get(validator=...) to revalidate the response.
+        body (memoryview): Zero-copy, read-only view of data.
+        text (str): Response body decoded as UTF-8 string. Decoded on first
+            access and cached, so binary responses never pay for it.
 
     Example:
         >>> from src.ut_components.http import get
@@ -50,12 +619,71 @@ class Response:
         ...     print(f"Request failed: {response.text}")
     """
 
-    def __init__(self, url: str, success: bool, status_code: int, data: bytes):
+    def __init__(
+        self,
+        url: str,
+        success: bool,
+        status_code: int,
+        data: bytes,
+        headers: Optional[http.client.HTTPMessage] = None,
+        error: Optional[Exception] = None,
+    ):
         self.url = url
         self.success = success
         self.status_code = status_code
         self.data = data
-        self.text = data.decode("utf-8", errors="ignore")
+        self.headers = headers if headers is not None else http.client.HTTPMessage()
+        self.error = error
+        self._text: Optional[str] = None
+
+    @property
+    def validator(self) -> Optional[str]:
+        """
+        The validator of this response, for a later conditional request.
+
+        Returns the ETag header (weak ones included) or, when the server does
+        not send one, the Last-Modified header. None if there is neither.
+
+        Example:
+            >>> response = get("https://api.example.com/albums")
+            >>> etag = response.validator
+            >>> later = get("https://api.example.com/albums", validator=etag)
+            >>> if later.status_code == 304:
+            ...     print("Albums did not change")
+        """
+        return self.headers.get("ETag") or self.headers.get("Last-Modified")
+
+    @property
+    def text(self) -> str:
+        """
+        The response body decoded as UTF-8.
+
+        Decoding happens on first access and the result is cached. Invalid
+        byte sequences are skipped.
+
+        Example:
+            >>> response = get("https://api.example.com/status")
+            >>> print(response.text)
+        """
+        if self._text is None:
+            self._text = self.data.decode("utf-8", errors="ignore")
+        return self._text
+
+    @property
+    def body(self) -> memoryview:
+        """
+        A read-only memoryview over the raw response body.
+
+        Slicing the view or passing it to file and socket writes does not
+        copy the underlying bytes, which matters for large image bodies.
+
+        Example:
+            >>> response = get("https://example.com/image.webp")
+            >>> header = response.body[:12]
+            >>> with open("/tmp/image.webp", "wb") as f:
+            ...     f.write(response.body)
+        """
+        return memoryview(self.data)
 
     def json(self) -> Dict:
         """
@@ -63,7 +691,8 @@ class Response:
 
         Converts the response data from bytes to a Python dictionary or list
         by parsing it as JSON. This is useful for working with REST APIs that
-        return JSON responses.
+        return JSON responses. The raw bytes are parsed directly, without
+        building the text attribute first.
 
         Returns:
             Dict: Parsed JSON data as a Python dictionary or list.
@@ -88,6 +717,7 @@ class Response:
         Use this for fail-fast error handling when you expect successful responses.
 
         Raises:
+            NotModified: If status_code is 304, after a conditional request.
             ValueError: If success is False (network error) or status_code >= 300.
 
         Example:
@@ -98,6 +728,8 @@ class Response:
             ... except ValueError as e:
             ...     print(f"Request failed: {e}")
         """
+        if self.status_code == 304:
+            raise NotModified(f"Request to url {self.url} was not modified")
         if not self.success:
             raise ValueError(f"Request to url {self.url} failed with error: {self.text}")
         if self.status_code >= 300:
@@ -119,6 +751,8 @@ def request(
     headers: Optional[Dict[str, str]] = None,
     follow_redirects: bool = True,
     max_redirects: int = 10,
+    compress: bool = True,
+    timeout: Optional[Tuple[Optional[float], Optional[float]]] = None,
 ) -> Response:
     """
     Perform a generic HTTP request with automatic redirect handling.
@@ -128,6 +762,25 @@ def request(
     behavior. It automatically handles various redirect status codes and follows
     them according to HTTP specifications.
 
+    Requests go through a pool of persistent HTTP/1.1 connections (see
+    configure_connection_pool()). If a reused connection turns out to have
+    been closed by the server, the request is sent again on a fresh one,
+    unless the server may already have processed it: a request with a
+    non-idempotent method such as POST or PATCH is only sent again when the
+    connection failed while the request was still being written. Otherwise
+    the connection error is returned in the Response.
+
+    Unless compress is False, the request advertises gzip and deflate (and
+    br when the brotli module is installed) in Accept-Encoding, and a
+    compressed body is decompressed while it is read, so Response.data is
+    always the decoded body. An Accept-Encoding header passed by the caller
+    is sent as is.
+
+    Every request has a connect and a read timeout (see configure_timeouts()).
+    Idempotent methods are retried with jittered exponential backoff on
+    network errors, timeouts, 429 and 5xx responses (see configure_retries()),
+    and the last response is returned once the retries run out.
+
     Args:
         url (str): The target URL for the request.
         method (str): HTTP method (GET, POST, PUT, DELETE, PATCH, etc.).
@@ -138,6 +791,12 @@ def request(
             Defaults to True.
         max_redirects (int): Maximum number of redirects to follow before failing.
             Defaults to 10.
+        compress (bool): Whether to negotiate a compressed response body.
+            Turn it off for content that is already compressed, such as
+            images and video, where it only costs CPU. Defaults to True.
+        timeout (Optional[Tuple[Optional[float], Optional[float]]]): Connect and
+            read timeouts in seconds for this request, None meaning no limit.
+            Defaults to the values set with configure_timeouts().
 
     Returns:
         Response: A Response object containing the result of the HTTP request.
@@ -160,91 +819,18 @@ def request(
         ...     follow_redirects=False
         ... )
     """
-    redirect_count = 0
-    current_url = url
-    current_method = method
-    current_data = data
-
-    while redirect_count < max_redirects:
-        try:
-            request = urllib.request.Request(
-                current_url,
-                data=current_data,
-                headers=headers or {},
-                method=current_method,
-            )
-            with urllib.request.urlopen(request) as response:
-                return Response(
-                    url=current_url,
-                    success=True,
-                    status_code=response.code,
-                    data=response.read(),
-                )
-        except urllib.error.HTTPError as e:
-            if follow_redirects and e.code in (301, 302, 303, 307, 308):
-                redirect_count += 1
-                location = e.headers.get("Location")
-                if not location:
-                    error_content = b""
-                    try:
-                        if e.fp:
-                            error_content = e.fp.read()
-                    except Exception:
-                        pass
-                    return Response(
-                        url=current_url,
-                        success=False,
-                        status_code=e.code,
-                        data=error_content,
-                    )
-
-                if not location.startswith(("http://", "https://")):
-                    from urllib.parse import urljoin
-
-                    location = urljoin(current_url, location)
-
-                current_url = location
-
-                if e.code == 303 or (e.code in (301, 302) and current_method in ("POST", "PUT", "DELETE")):
-                    current_method = "GET"
-                    current_data = None
-                elif e.code in (307, 308):
-                    pass
-
-                continue
-            else:
-                error_content = b""
-                try:
-                    if e.fp:
-                        error_content = e.fp.read()
-                except Exception:
-                    pass
-
-                return Response(
-                    url=current_url,
-                    success=False,
-                    status_code=e.code,
-                    data=error_content,
-                )
-        except urllib.error.URLError as e:
-            return Response(
-                url=current_url,
-                success=False,
-                status_code=0,
-                data=str(e.reason).encode(),
-            )
-        except Exception as e:
-            return Response(url=current_url, success=False, status_code=0, data=str(e).encode())
-
-    return Response(
-        url=current_url,
-        success=False,
-        status_code=0,
-        data=b"Maximum redirects exceeded",
+    return _perform(
+        url, method, data, headers or {}, follow_redirects, max_redirects, compress=compress, timeout=timeout
     )
 
 
-def post(url: str, json: Optional[Dict] = None, headers: Optional[Dict[str, str]] = None) -> Response:
+def post(
+    url: str,
+    json: Optional[Dict] = None,
+    headers: Optional[Dict[str, str]] = None,
+    compress: bool = True,
+    timeout: Optional[Tuple[Optional[float], Optional[float]]] = None,
+) -> Response:
     """
     Perform an HTTP POST request to send data to a server.
 
@@ -261,6 +847,10 @@ def post(url: str, json: Optional[Dict] = None, headers: Optional[Dict[str, str]
         headers (Optional[Dict[str, str]]): Additional HTTP headers to include.
             The Content-Type header is automatically set when json is provided.
             Defaults to None.
+        compress (bool): Negotiate a compressed response body, see request().
+            Defaults to True.
+        timeout (Optional[Tuple[Optional[float], Optional[float]]]): Connect and
+            read timeouts for this request, see request(). Defaults to None.
 
     Returns:
         Response: A Response object containing the server's response.
@@ -296,13 +886,16 @@ def post(url: str, json: Optional[Dict] = None, headers: Optional[Dict[str, str]
     if headers:
         request_headers.update(headers)
 
-    return request(url, method="POST", data=data, headers=request_headers)
+    return request(url, method="POST", data=data, headers=request_headers, compress=compress, timeout=timeout)
 
 
 def get(
     url: str,
     headers: Optional[Dict[str, str]] = None,
     params: Optional[Dict[str, str]] = None,
+    validator: Optional[str] = None,
+    compress: bool = True,
+    timeout: Optional[Tuple[Optional[float], Optional[float]]] = None,
 ) -> Response:
     """
     Perform an HTTP GET request to retrieve data from a server.
@@ -318,6 +911,14 @@ def get(
             Common headers include Authorization, User-Agent, etc. Defaults to None.
         params (Optional[Dict[str, str]]): Query parameters to append to the URL.
             These will be URL-encoded automatically. Defaults to None.
+        validator (Optional[str]): Response.validator of an earlier response
+            for the same URL. An ETag is sent as If-None-Match and a date as
+            If-Modified-Since, and the server answers 304 with an empty body
+            if the resource did not change. Defaults to None.
+        compress (bool): Negotiate a compressed response body, see request().
+            Defaults to True.
+        timeout (Optional[Tuple[Optional[float], Optional[float]]]): Connect and
+            read timeouts for this request, see request(). Defaults to None.
 
     Returns:
         Response: A Response object containing the server's response.
@@ -341,19 +942,36 @@ def get(
         ...     url="https://api.example.com/profile",
         ...     headers={"Authorization": "Bearer token123"}
         ... )
+        >>>
+        >>> # Revalidate an earlier response
+        >>> response = get("https://api.example.com/users", validator=etag)
+        >>> if response.status_code == 304:
+        ...     users = cached_users
     """
     request_headers = {}
     if params:
         query_string = urllib.parse.urlencode(params)
         url = f"{url}?{query_string}"
 
+    if validator:
+        if validator.startswith(('"', "W/")):
+            request_headers["If-None-Match"] = validator
+        else:
+            request_headers["If-Modified-Since"] = validator
+
     if headers:
         request_headers.update(headers)
 
-    return request(url, method="GET", headers=request_headers)
+    return request(url, method="GET", headers=request_headers, compress=compress, timeout=timeout)
 
 
-def put(url: str, json: Optional[Dict] = None, headers: Optional[Dict[str, str]] = None) -> Response:
+def put(
+    url: str,
+    json: Optional[Dict] = None,
+    headers: Optional[Dict[str, str]] = None,
+    compress: bool = True,
+    timeout: Optional[Tuple[Optional[float], Optional[float]]] = None,
+) -> Response:
     """
     Perform an HTTP PUT request to update existing resources on a server.
 
@@ -371,6 +989,10 @@ def put(url: str, json: Optional[Dict] = None, headers: Optional[Dict[str, str]]
         headers (Optional[Dict[str, str]]): Additional HTTP headers to include.
             The Content-Type header is automatically set when json is provided.
             Defaults to None.
+        compress (bool): Negotiate a compressed response body, see request().
+            Defaults to True.
+        timeout (Optional[Tuple[Optional[float], Optional[float]]]): Connect and
+            read timeouts for this request, see request(). Defaults to None.
 
     Returns:
         Response: A Response object containing the server's response.
@@ -407,10 +1029,16 @@ def put(url: str, json: Optional[Dict] = None, headers: Optional[Dict[str, str]]
     if headers:
         request_headers.update(headers)
 
-    return request(url, method="PUT", data=data, headers=request_headers)
+    return request(url, method="PUT", data=data, headers=request_headers, compress=compress, timeout=timeout)
 
 
-def delete(url: str, json: Optional[Dict] = None, headers: Optional[Dict[str, str]] = None) -> Response:
+def delete(
+    url: str,
+    json: Optional[Dict] = None,
+    headers: Optional[Dict[str, str]] = None,
+    compress: bool = True,
+    timeout: Optional[Tuple[Optional[float], Optional[float]]] = None,
+) -> Response:
     """
     Perform an HTTP DELETE request to remove a resource from a server.
 
@@ -428,6 +1056,10 @@ def delete(url: str, json: Optional[Dict] = None, headers: Optional[Dict[str, st
         headers (Optional[Dict[str, str]]): Additional HTTP headers to include.
             The Content-Type header is automatically set when json is provided.
             Defaults to None.
+        compress (bool): Negotiate a compressed response body, see request().
+            Defaults to True.
+        timeout (Optional[Tuple[Optional[float], Optional[float]]]): Connect and
+            read timeouts for this request, see request(). Defaults to None.
 
     Returns:
         Response: A Response object containing the server's response.
@@ -461,7 +1093,7 @@ def delete(url: str, json: Optional[Dict] = None, headers: Optional[Dict[str, st
     if headers:
         request_headers.update(headers)
 
-    return request(url, method="DELETE", data=data, headers=request_headers)
+    return request(url, method="DELETE", data=data, headers=request_headers, compress=compress, timeout=timeout)
 
 
 def post_file(
@@ -556,3 +1188,166 @@ def post_file(
         request_headers.update(headers)
 
     return request(url, method="POST", data=body, headers=request_headers)
+
+
+def _acquire_path_lock(path: str) -> None:
+    with _PATH_LOCKS_LOCK:
+        entry = _PATH_LOCKS.setdefault(path, [threading.Lock(), 0])
+        entry[1] += 1
+    entry[0].acquire()
+
+
+def _release_path_lock(path: str) -> None:
+    with _PATH_LOCKS_LOCK:
+        entry = _PATH_LOCKS[path]
+        entry[0].release()
+        entry[1] -= 1
+        if not entry[1]:
+            del _PATH_LOCKS[path]
+
+
+def _remove(*paths: str) -> None:
+    for path in paths:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def _strong_validator(headers: http.client.HTTPMessage) -> Optional[str]:
+    etag = headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return headers.get("Last-Modified")
+
+
+def _content_range_start(content_range: Optional[str]) -> Optional[int]:
+    if not content_range or not content_range.startswith("bytes "):
+        return None
+    try:
+        return int(content_range[6:].split("-", 1)[0])
+    except ValueError:
+        return None
+
+
+def _download_part(
+    url: str, file_path: str, headers: Dict[str, str], chunk_size: int, timeout: Optional[_Timeout]
+) -> Tuple[Response, bool]:
+    part_path = f"{file_path}.part"
+    validator_path = f"{part_path}.validator"
+
+    validator = None
+    if os.path.isfile(part_path) and os.path.isfile(validator_path):
+        with open(validator_path) as f:
+            validator = f.read() or None
+    offset = os.path.getsize(part_path) if validator else 0
+    if not offset:
+        _remove(part_path, validator_path)
+
+    request_headers = dict(headers)
+    if offset:
+        request_headers["Range"] = f"bytes={offset}-"
+        request_headers["If-Range"] = validator
+
+    def consume(response: http.client.HTTPResponse) -> bytes:
+        if response.status == 206:
+            if _content_range_start(response.headers.get("Content-Range")) != offset:
+                raise ValueError(f"unexpected Content-Range {response.headers.get('Content-Range')}")
+            mode = "ab"
+        else:
+            mode = "wb"
+            new_validator = _strong_validator(response.headers)
+            if new_validator:
+                with open(validator_path, "w") as f:
+                    f.write(new_validator)
+            else:
+                _remove(validator_path)
+
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        with open(part_path, mode) as f:
+            while True:
+                read = response.readinto(buffer)
+                if not read:
+                    break
+                f.write(view[:read])
+        if response.length:
+            raise http.client.IncompleteRead(b"", response.length)
+        os.replace(part_path, file_path)
+        _remove(validator_path)
+        return b""
+
+    return _perform(url, "GET", None, request_headers, True, 10, consume=consume, timeout=timeout), bool(offset)
+
+
+def download(
+    url: str,
+    file_path: str,
+    headers: Optional[Dict[str, str]] = None,
+    chunk_size: int = 65536,
+    timeout: Optional[Tuple[Optional[float], Optional[float]]] = None,
+) -> Response:
+    """
+    Download a resource straight to a file, resuming interrupted transfers.
+
+    The response body is copied to file_path + ".part" in chunks of
+    chunk_size bytes, reusing a single buffer, so memory use stays constant
+    no matter how large the download is. The part file is renamed over
+    file_path only once the whole body has arrived, so file_path never
+    contains a partial download and can safely be used as a cache marker.
+
+    If a transfer is interrupted, the part file is kept along with the
+    server's ETag (or Last-Modified date). The next download of the same
+    file_path asks only for the missing bytes with a Range request guarded
+    by If-Range. If the resource changed in between, the server sends the
+    whole body and the download starts over. Servers without validators
+    or range support always get a full download. Concurrent downloads to
+    the same file_path in this process run one after the other. Redirects
+    are followed like in request(). Compression is never negotiated, so the
+    bytes on disk and the byte ranges always match the resource itself.
+
+    Network errors, timeouts, 429 and 5xx responses are retried like in
+    request(), and each retry resumes from the bytes already on disk.
+
+    Args:
+        url (str): The URL to download.
+        file_path (str): Where to store the body. Its directory must exist.
+        headers (Optional[Dict[str, str]]): HTTP headers to include in the
+            request. Defaults to None.
+        chunk_size (int): Number of bytes read and written at a time.
+            Defaults to 64 KiB.
+        timeout (Optional[Tuple[Optional[float], Optional[float]]]): Connect and
+            read timeouts for each attempt, see request(). Defaults to None.
+
+    Returns:
+        Response: The result of the request. On success data is empty and
+        the body is in file_path. On HTTP errors data holds the error body.
+
+    Example:
+        >>> from src.ut_components.http import download
+        >>>
+        >>> response = download(
+        ...     url="https://example.com/videos/big.mp4",
+        ...     file_path="/tmp/big.mp4",
+        ...     headers={"Authorization": "Bearer token123"}
+        ... )
+        >>> response.raise_for_status()
+        >>>
+        >>> # After a network error, calling it again resumes the transfer
+    """
+    _acquire_path_lock(file_path)
+    try:
+        attempt = 0
+        while True:
+            response, resumed = _download_part(url, file_path, headers or {}, chunk_size, timeout)
+            if resumed and response.status_code == 416:
+                _remove(f"{file_path}.part", f"{file_path}.part.validator")
+                response, _ = _download_part(url, file_path, headers or {}, chunk_size, timeout)
+            delay = _RETRY.delay(attempt, response)
+            if delay is None:
+                return response
+            _STATS.record_retry(response)
+            attempt += 1
+            time.sleep(delay)
+    finally:
+        _release_path_lock(file_path)
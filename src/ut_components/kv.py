@@ -17,11 +17,214 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 import json
 import os
 import sqlite3
+import threading
 from datetime import datetime, timedelta
-from typing import Any, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 from .config import get_config_path
 
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS kv (
+        key TEXT PRIMARY KEY,
+        value TEXT default '',
+        ttl integer DEFAULT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS kv_ttl ON kv (ttl)",
+    """
+    CREATE TABLE IF NOT EXISTS kv_tags (
+        tag TEXT NOT NULL,
+        key TEXT NOT NULL,
+        PRIMARY KEY (tag, key)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS kv_tags_key ON kv_tags (key)",
+]
+
+_SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+_TEMP_STORE_MODES = ("DEFAULT", "FILE", "MEMORY")
+
+_PRAGMAS: Dict[str, Any] = {
+    "synchronous": "NORMAL",
+    "cache_size": -4096,
+    "mmap_size": 33554432,
+    "temp_store": "MEMORY",
+}
+_PRAGMAS_VERSION = 0
+
+_MAX_QUERY_PARAMETERS = 500
+
+_SCHEMA_LOCK = threading.Lock()
+_INITIALIZED_DATABASES: Set[str] = set()
+_LOCAL = threading.local()
+
+
+def set_pragmas(
+    synchronous: Optional[str] = None,
+    cache_size: Optional[int] = None,
+    mmap_size: Optional[int] = None,
+    temp_store: Optional[str] = None,
+) -> None:
+    """
+    Tune the SQLite pragmas applied to every kv.db connection.
+
+    The database always runs in WAL journal mode, so readers never block
+    behind a writer. These settings control the remaining trade-offs between
+    durability, memory use and speed. Only the arguments that are passed are
+    changed; pooled connections pick up the new values the next time a KV
+    is opened on their thread.
+
+    Args:
+        synchronous (Optional[str]): One of OFF, NORMAL, FULL or EXTRA.
+            NORMAL (the default) is durable across application crashes in
+            WAL mode and only syncs on checkpoints.
+        cache_size (Optional[int]): Page cache size. Negative values are in
+            KiB, positive values in pages. Defaults to -4096 (4 MiB).
+        mmap_size (Optional[int]): Maximum number of bytes of the database
+            to memory-map. 0 disables memory-mapped I/O. Defaults to 32 MiB.
+        temp_store (Optional[str]): One of DEFAULT, FILE or MEMORY.
+            Defaults to MEMORY.
+
+    Raises:
+        ValueError: If a mode is not recognized or a size is not an integer.
+
+    Example:
+        >>> from src.ut_components.kv import set_pragmas
+        >>>
+        >>> # Favour durability over write speed
+        >>> set_pragmas(synchronous="FULL")
+        >>>
+        >>> # Use less memory on constrained devices
+        >>> set_pragmas(cache_size=-1024, mmap_size=0)
+    """
+    global _PRAGMAS_VERSION
+    pragmas = dict(_PRAGMAS)
+    if synchronous is not None:
+        if synchronous.upper() not in _SYNCHRONOUS_MODES:
+            raise ValueError(f"invalid synchronous mode: {synchronous}")
+        pragmas["synchronous"] = synchronous.upper()
+    if temp_store is not None:
+        if temp_store.upper() not in _TEMP_STORE_MODES:
+            raise ValueError(f"invalid temp_store mode: {temp_store}")
+        pragmas["temp_store"] = temp_store.upper()
+    if cache_size is not None:
+        if not isinstance(cache_size, int):
+            raise ValueError(f"invalid cache_size: {cache_size}")
+        pragmas["cache_size"] = cache_size
+    if mmap_size is not None:
+        if not isinstance(mmap_size, int) or mmap_size < 0:
+            raise ValueError(f"invalid mmap_size: {mmap_size}")
+        pragmas["mmap_size"] = mmap_size
+    _PRAGMAS.update(pragmas)
+    _PRAGMAS_VERSION += 1
+
+
+def _prefix_range(beginning: str) -> Tuple[str, List[str]]:
+    # Keys sharing a prefix form a contiguous range in the primary key index:
+    # [prefix, successor) where successor bumps the prefix's last code point.
+    successor = beginning
+    while successor:
+        last = ord(successor[-1])
+        if last < 0x10FFFF:
+            next_code_point = 0xE000 if 0xD800 <= last + 1 <= 0xDFFF else last + 1
+            successor = successor[:-1] + chr(next_code_point)
+            return "key >= ? AND key < ?", [beginning, successor]
+        successor = successor[:-1]
+    return "key >= ?", [beginning]
+
+
+def _apply_pragmas(conn: sqlite3.Connection) -> None:
+    for name, value in _PRAGMAS.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+
+
+def register_schema(*statements: str) -> None:
+    """
+    Register extra SQL statements to run when kv.db is initialized.
+
+    Lets an application keep its own tables and indexes in the same
+    database as the KV store, sharing the pooled per-thread connections.
+    Statements should be idempotent (CREATE TABLE IF NOT EXISTS, CREATE
+    INDEX IF NOT EXISTS) because they run once per process, including
+    against databases that already contain them.
+
+    Args:
+        *statements (str): SQL statements to execute, in order.
+
+    Example:
+        >>> from src.ut_components.kv import get_connection, register_schema
+        >>>
+        >>> register_schema(
+        ...     "CREATE TABLE IF NOT EXISTS notes (id TEXT PRIMARY KEY, body TEXT)"
+        ... )
+        >>> get_connection().execute("SELECT COUNT(*) FROM notes").fetchone()
+    """
+    with _SCHEMA_LOCK:
+        for statement in statements:
+            if statement not in _SCHEMA:
+                _SCHEMA.append(statement)
+        _INITIALIZED_DATABASES.clear()
+
+
+def _initialize_database(database_path: str) -> None:
+    with _SCHEMA_LOCK:
+        if database_path in _INITIALIZED_DATABASES:
+            return
+        os.makedirs(os.path.dirname(database_path), exist_ok=True)
+        conn = sqlite3.connect(database_path)
+        try:
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("PRAGMA journal_mode = WAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            conn.commit()
+        finally:
+            conn.close()
+        _INITIALIZED_DATABASES.add(database_path)
+
+
+def get_connection() -> sqlite3.Connection:
+    """
+    Get the pooled SQLite connection to kv.db for the calling thread.
+
+    Each thread keeps a single connection open for the lifetime of the
+    process, and the database schema is created only once per process.
+    This makes opening a KV instance essentially free, which matters
+    because KV is opened on almost every call into the application.
+    The database is kept in WAL mode and every connection is configured
+    with the pragmas set through set_pragmas().
+
+    Returns:
+        sqlite3.Connection: The connection owned by the current thread. Do
+        not close it or share it with other threads.
+
+    Example:
+        >>> from src.ut_components.kv import get_connection
+        >>>
+        >>> conn = get_connection()
+        >>> count = conn.execute("SELECT COUNT(*) FROM kv").fetchone()[0]
+    """
+    database_path = os.path.join(get_config_path(), "kv.db")
+    if database_path not in _INITIALIZED_DATABASES:
+        _initialize_database(database_path)
+
+    connections: Optional[Dict[str, Tuple[sqlite3.Connection, int]]] = getattr(_LOCAL, "connections", None)
+    if connections is None:
+        connections = {}
+        _LOCAL.connections = connections
+
+    pooled = connections.get(database_path)
+    if pooled is None:
+        conn = sqlite3.connect(database_path)
+    else:
+        conn, pragmas_version = pooled
+        if pragmas_version == _PRAGMAS_VERSION:
+            return conn
+    _apply_pragmas(conn)
+    connections[database_path] = (conn, _PRAGMAS_VERSION)
+    return conn
+
 
 class KV:
     """
@@ -37,8 +240,11 @@ class KV:
         - TTL support for automatic expiration
         - Batch operations for improved performance
         - Prefix-based queries and deletions
+        - Dependency tags for targeted invalidation
+        - Batched removal of expired entries and database compaction
         - Context manager support for automatic cleanup
         - JSON serialization for complex data types
+        - One pooled connection per thread, so opening a KV is cheap
 
     Example:
         >>> from src.ut_components.kv import KV
@@ -66,9 +272,11 @@ class KV:
         """
         Initialize the KV storage system and create the database if needed.
 
-        Creates a SQLite database in the application's config directory
-        (as determined by get_config_path()) and sets up the necessary
-        table structure for key-value storage with TTL support.
+        Uses a SQLite database in the application's config directory
+        (as determined by get_config_path()). The table structure is created
+        the first time the database is used in the process, and the
+        connection is borrowed from a per-thread pool (see get_connection()),
+        so creating KV instances in hot paths is cheap.
 
         The database file is created at: {config_path}/kv.db
 
@@ -82,22 +290,11 @@ class KV:
             >>> kv.put("my_key", "my_value")
             >>> kv.close()
         """
-        config_folder = get_config_path()
-        os.makedirs(config_folder, exist_ok=True)
-        self.conn = sqlite3.connect(os.path.join(config_folder, "kv.db"))
+        self.conn = get_connection()
         self.cursor = self.conn.cursor()
-        self.cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS kv (
-                key TEXT PRIMARY KEY,
-                value TEXT default '',
-                ttl integer DEFAULT NULL
-            )
-        """
-        )
-        self.conn.commit()
         self.cache_values = []
         self.cache_row_count = 0
+        self.cache_tags: Dict[str, List[str]] = {}
 
     def _encode_value(self, value: Any) -> str:
         return json.dumps({"value": value})
@@ -105,7 +302,14 @@ class KV:
     def _decode_value(self, value: str) -> Any:
         return json.loads(value).get("value", None)
 
-    def put(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> None:
+    def _replace_tags(self, tags_by_key: Dict[str, List[str]]) -> None:
+        self.cursor.executemany("DELETE FROM kv_tags WHERE key = ?", [(key,) for key in tags_by_key])
+        self.cursor.executemany(
+            "INSERT OR IGNORE INTO kv_tags (tag, key) VALUES (?, ?)",
+            [(tag, key) for key, tags in tags_by_key.items() for tag in tags],
+        )
+
+    def put(self, key: str, value: Any, ttl_seconds: Optional[int] = None, tags: Optional[Iterable[str]] = None) -> int:
         """
         Store a key-value pair in the database with optional TTL.
 
@@ -121,6 +325,13 @@ class KV:
             ttl_seconds (Optional[int]): Time-to-live in seconds. If provided,
                 the entry will automatically expire after this duration.
                 Defaults to None (no expiration).
+            tags (Optional[Iterable[str]]): Dependency tags for the entry,
+                used by delete_tagged(). When given, they replace the tags
+                previously stored for the key. Defaults to None (keep them).
+
+        Returns:
+            int: The length of the stored JSON, the same size get_entry()
+            reports for the entry.
 
         Example:
             >>> kv = KV()
@@ -138,6 +349,9 @@ class KV:
             >>> # Store with expiration (1 hour)
             >>> kv.put("session:token", "abc123xyz", ttl_seconds=3600)
             >>>
+            >>> # Store with dependency tags
+            >>> kv.put("page:album:1", ["a", "b"], tags=["album:1", "asset:a", "asset:b"])
+            >>>
             >>> kv.close()
         """
         if ttl_seconds:
@@ -145,13 +359,17 @@ class KV:
         else:
             ttl = None
 
+        encoded = self._encode_value(value)
         self.cursor.execute(
             """
             INSERT OR REPLACE INTO kv (key, value, ttl) VALUES (?, ?, ?)
         """,
-            (key, self._encode_value(value), ttl),
+            (key, encoded, ttl),
         )
+        if tags is not None:
+            self._replace_tags({key: list(tags)})
         self.conn.commit()
+        return len(encoded)
 
     def get(
         self,
@@ -224,12 +442,117 @@ class KV:
 
         return self._decode_value(result)
 
+    def get_with_ttl(self, key: str, default: Optional[Any] = None) -> Tuple[Optional[Any], Optional[int]]:
+        """
+        Retrieve a value together with its expiration time.
+
+        Works like get(), but also returns when the entry expires. This is
+        useful for layering other caches on top of KV that must not outlive
+        the stored entry.
+
+        Args:
+            key (str): The key to look up in the storage.
+            default (Optional[Any]): The value to return if the key is not found
+                or has expired. Defaults to None.
+
+        Returns:
+            Tuple[Optional[Any], Optional[int]]: A tuple of (value, ttl) where
+            ttl is the expiration time as a Unix timestamp in seconds, or None
+            if the entry never expires or was not found.
+
+        Example:
+            >>> with KV() as kv:
+            ...     kv.put("session:token", "abc123xyz", ttl_seconds=3600)
+            ...     token, expires_at = kv.get_with_ttl("session:token")
+        """
+        value, ttl, _ = self.get_entry(key, default)
+        return value, ttl
+
+    def get_entry(self, key: str, default: Optional[Any] = None) -> Tuple[Optional[Any], Optional[int], int]:
+        """
+        Retrieve a value together with its expiration time and stored size.
+
+        Works like get_with_ttl(), but also returns the length of the JSON
+        the value is stored as. Caches layered on top of KV can use it to
+        account for memory without encoding the decoded value again.
+
+        Args:
+            key (str): The key to look up in the storage.
+            default (Optional[Any]): The value to return if the key is not found
+                or has expired. Defaults to None.
+
+        Returns:
+            Tuple[Optional[Any], Optional[int], int]: A tuple of (value, ttl,
+            size). ttl is the expiration time as a Unix timestamp in seconds,
+            or None if the entry never expires or was not found. size is the
+            length of the stored JSON, or 0 if the entry was not found.
+
+        Example:
+            >>> with KV() as kv:
+            ...     kv.put("album:1", {"title": "Trip", "assets": ["a", "b"]})
+            ...     album, expires_at, size = kv.get_entry("album:1")
+        """
+        now_seconds = int(datetime.now().timestamp())
+
+        self.cursor.execute(
+            """
+            SELECT value, ttl FROM kv WHERE key = ? AND (ttl IS NULL OR ttl > ?)
+        """,
+            (key, now_seconds),
+        )
+        result = self.cursor.fetchone()
+        if not result or not result[0]:
+            return default, None, 0
+        return self._decode_value(result[0]), result[1], len(result[0])
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Retrieve several values from the database in a single query.
+
+        Fetches all the given keys with one indexed lookup instead of one
+        round trip per key. Keys that don't exist or have expired are left
+        out of the result, so use dict.get() to supply defaults.
+
+        Args:
+            keys (Iterable[str]): The keys to look up. Duplicates are ignored.
+
+        Returns:
+            Dict[str, Any]: A mapping of each found key to its value. Values
+            are automatically deserialized from JSON.
+
+        Example:
+            >>> with KV() as kv:
+            ...     kv.put("user:1:name", "Alice")
+            ...     kv.put("user:1:email", "alice@example.com")
+            ...     values = kv.get_many(["user:1:name", "user:1:email", "user:1:age"])
+            >>> print(values)  # {"user:1:name": "Alice", "user:1:email": "alice@example.com"}
+            >>> age = values.get("user:1:age", 0)
+        """
+        unique_keys = list(dict.fromkeys(keys))
+        now_seconds = int(datetime.now().timestamp())
+
+        result = {}
+        for start in range(0, len(unique_keys), _MAX_QUERY_PARAMETERS):
+            chunk = unique_keys[start : start + _MAX_QUERY_PARAMETERS]
+            placeholders = ",".join(["?" for _ in chunk])
+            self.cursor.execute(
+                f"""
+                SELECT key, value FROM kv WHERE key IN ({placeholders}) AND (ttl IS NULL OR ttl > ?)
+            """,
+                (*chunk, now_seconds),
+            )
+            for key, value in self.cursor.fetchall():
+                result[key] = self._decode_value(value)
+        return result
+
     def get_partial(self, beginning: str) -> List[Tuple[str, Any]]:
         """
         Retrieve all key-value pairs where keys start with a given prefix.
 
         Performs a prefix search on keys and returns all matching entries
         that haven't expired. Results are sorted by value (in JSON string form).
+        The prefix is matched case-sensitively as a range scan over the key
+        index, so the cost depends on the number of matches, not table size.
         This is useful for implementing features like autocomplete, finding
         all items in a category, or retrieving related configuration options.
 
@@ -267,12 +590,13 @@ class KV:
             >>> kv.close()
         """
         now_seconds = int(datetime.now().timestamp())
+        key_condition, params = _prefix_range(beginning)
 
         self.cursor.execute(
-            """
-            SELECT key, value FROM kv WHERE key LIKE ? || '%' AND (ttl IS NULL OR ttl > ?) ORDER BY value
+            f"""
+            SELECT key, value FROM kv WHERE {key_condition} AND (ttl IS NULL OR ttl > ?) ORDER BY value
         """,
-            (beginning, now_seconds),
+            (*params, now_seconds),
         )
         result = self.cursor.fetchall()
         return [(x[0], self._decode_value(x[1])) for x in result]
@@ -324,9 +648,10 @@ class KV:
             ...         older, cursor = kv.get_partial_page("msg:chat1:", page_size=50, cursor=cursor, reverse=True)
         """
         now_seconds = int(datetime.now().timestamp())
+        key_condition, key_params = _prefix_range(beginning)
 
-        conditions = ["key LIKE ? || '%'", "(ttl IS NULL OR ttl > ?)"]
-        params: list = [beginning, now_seconds]
+        conditions = [key_condition, "(ttl IS NULL OR ttl > ?)"]
+        params: list = [*key_params, now_seconds]
 
         if cursor is not None:
             if reverse:
@@ -378,6 +703,7 @@ class KV:
         """,
             (key,),
         )
+        self.cursor.execute("DELETE FROM kv_tags WHERE key = ?", (key,))
         self.conn.commit()
 
     def delete_partial(self, beginning: str):
@@ -386,7 +712,8 @@ class KV:
 
         Performs a bulk deletion of all entries whose keys match the specified
         prefix. This is useful for cleaning up related data, removing all items
-        in a category, or clearing cache entries with a common prefix.
+        in a category, or clearing cache entries with a common prefix. Like
+        get_partial(), the prefix is matched case-sensitively using the key index.
 
         Args:
             beginning (str): The prefix to match. All keys starting with
@@ -415,21 +742,144 @@ class KV:
             >>>
             >>> kv.close()
         """
+        key_condition, params = _prefix_range(beginning)
         self.cursor.execute(
-            """
-            DELETE FROM kv WHERE key like ? || '%'
+            f"""
+            DELETE FROM kv WHERE {key_condition}
         """,
-            (beginning,),
+            params,
         )
+        self.cursor.execute(f"DELETE FROM kv_tags WHERE {key_condition}", params)
+        self.conn.commit()
+
+    def delete_tagged(self, tags: Iterable[str]) -> List[str]:
+        """
+        Delete every entry carrying any of the given dependency tags.
+
+        Entries are tagged when they are written with put(..., tags=...) or
+        put_cached(..., tags=...). This removes exactly the entries that
+        depend on something that changed, instead of clearing a whole prefix.
+
+        Args:
+            tags (Iterable[str]): The tags to invalidate.
+
+        Returns:
+            List[str]: The keys that were deleted, so callers can drop any
+            copies they keep elsewhere.
+
+        Example:
+            >>> with KV() as kv:
+            ...     kv.put("page:album:1", ["a", "b"], tags=["album:1", "asset:a", "asset:b"])
+            ...     kv.put("page:album:2", ["c"], tags=["album:2", "asset:c"])
+            ...     print(kv.delete_tagged(["asset:b"]))  # ["page:album:1"]
+            ...     print(kv.get("page:album:2"))  # ["c"]
+        """
+        unique_tags = list(dict.fromkeys(tags))
+        keys: List[str] = []
+        for start in range(0, len(unique_tags), _MAX_QUERY_PARAMETERS):
+            chunk = unique_tags[start : start + _MAX_QUERY_PARAMETERS]
+            placeholders = ",".join(["?" for _ in chunk])
+            self.cursor.execute(f"SELECT DISTINCT key FROM kv_tags WHERE tag IN ({placeholders})", chunk)
+            keys.extend(row[0] for row in self.cursor.fetchall())
+        keys = list(dict.fromkeys(keys))
+
+        for start in range(0, len(keys), _MAX_QUERY_PARAMETERS):
+            chunk = keys[start : start + _MAX_QUERY_PARAMETERS]
+            placeholders = ",".join(["?" for _ in chunk])
+            self.cursor.execute(f"DELETE FROM kv WHERE key IN ({placeholders})", chunk)
+            self.cursor.execute(f"DELETE FROM kv_tags WHERE key IN ({placeholders})", chunk)
+        self.conn.commit()
+        return keys
+
+    def delete_expired(self, batch_size: int = 500, max_batches: Optional[int] = None) -> int:
+        """
+        Physically remove expired entries from the database.
+
+        Expired entries are never returned by the read methods, but they stay
+        on disk until they are deleted. This method removes them in batches
+        of batch_size rows, committing after each batch so writers from
+        other threads are never blocked for long. The lookup uses the index
+        on the ttl column. Tags left behind by removed entries are dropped
+        at the end.
+
+        Args:
+            batch_size (int): Maximum number of rows deleted per transaction.
+                Defaults to 500.
+            max_batches (Optional[int]): Stop after this many batches, leaving
+                the rest for a later call. Defaults to None (no limit).
+
+        Returns:
+            int: The number of entries removed.
+
+        Example:
+            >>> with KV() as kv:
+            ...     kv.put("temp", "data", ttl_seconds=1)
+            ...     time.sleep(2)
+            ...     print(kv.delete_expired())  # 1
+        """
+        now_seconds = int(datetime.now().timestamp())
+        deleted = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            self.cursor.execute(
+                """
+                DELETE FROM kv WHERE rowid IN (SELECT rowid FROM kv WHERE ttl <= ? LIMIT ?)
+            """,
+                (now_seconds, batch_size),
+            )
+            self.conn.commit()
+            deleted += self.cursor.rowcount
+            batches += 1
+            if self.cursor.rowcount < batch_size:
+                break
+        self.cursor.execute("DELETE FROM kv_tags WHERE NOT EXISTS (SELECT 1 FROM kv WHERE kv.key = kv_tags.key)")
+        self.conn.commit()
+        return deleted
+
+    def compact(self, min_free_bytes: int = 8388608) -> bool:
+        """
+        Return unused database pages to the filesystem.
+
+        Deleting entries leaves free pages inside kv.db. When the free space
+        reaches min_free_bytes, this method releases it with an incremental
+        vacuum. Databases created before incremental auto-vacuum was enabled
+        are converted with a one-time full VACUUM.
+
+        Args:
+            min_free_bytes (int): Only compact when at least this many bytes
+                are free. Defaults to 8 MiB.
+
+        Returns:
+            bool: True if the database was compacted, False otherwise.
+
+        Example:
+            >>> with KV() as kv:
+            ...     kv.delete_partial("cache:")
+            ...     kv.compact(min_free_bytes=0)
+        """
+        self.conn.commit()
+        page_size = self.conn.execute("PRAGMA page_size").fetchone()[0]
+        free_pages = self.conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if free_pages == 0 or page_size * free_pages < min_free_bytes:
+            return False
+
+        auto_vacuum = self.conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if auto_vacuum == 2:
+            self.conn.execute("PRAGMA incremental_vacuum").fetchall()
+        else:
+            self.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            self.conn.execute("VACUUM")
         self.conn.commit()
+        return True
 
     def close(self) -> None:
         """
-        Close the database connection and commit any pending changes.
+        Commit any pending changes and release the database connection.
 
-        Ensures all pending transactions are committed and properly closes
-        the SQLite database connection. This should be called when you're
-        done using the KV instance to free up resources.
+        Ensures all pending transactions are committed. The underlying SQLite
+        connection is pooled per thread, so it stays open and is reused by
+        the next KV instance created on the same thread. This should be
+        called when you're done using the KV instance.
 
         Note: If using the KV class as a context manager (with statement),
         this method is called automatically.
@@ -437,7 +887,7 @@ class KV:
         Example:
             >>> kv = KV()
             >>> kv.put("data", "value")
-            >>> kv.close()  # Ensures data is saved and connection is closed
+            >>> kv.close()  # Ensures data is saved and connection is released
             >>>
             >>> # Or use context manager for automatic cleanup
             >>> with KV() as kv:
@@ -445,7 +895,7 @@ class KV:
             >>> # close() is called automatically here
         """
         self.conn.commit()
-        self.conn.close()
+        self.cursor.close()
 
     def __enter__(self):
         return self
@@ -453,7 +903,9 @@ class KV:
     def __exit__(self, exc_type, exc_value, traceback):
         self.close()
 
-    def put_cached(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> None:
+    def put_cached(
+        self, key: str, value: Any, ttl_seconds: Optional[int] = None, tags: Optional[Iterable[str]] = None
+    ) -> None:
         """
         Add a key-value pair to the cache for batch insertion.
 
@@ -469,6 +921,8 @@ class KV:
             ttl_seconds (Optional[int]): Time-to-live in seconds. If provided,
                 the entry will automatically expire after this duration.
                 Defaults to None (no expiration).
+            tags (Optional[Iterable[str]]): Dependency tags for the entry,
+                written on commit_cached(). See put(). Defaults to None.
 
         Example:
             >>> kv = KV()
@@ -496,6 +950,8 @@ class KV:
 
         self.cache_values.extend([key, self._encode_value(value), ttl])
         self.cache_row_count += 1
+        if tags is not None:
+            self.cache_tags[key] = list(tags)
 
     def commit_cached(self) -> None:
         """
@@ -540,6 +996,9 @@ class KV:
         """
 
         self.cursor.execute(sql, self.cache_values)
+        if self.cache_tags:
+            self._replace_tags(self.cache_tags)
         self.conn.commit()
         self.cache_values = []
         self.cache_row_count = 0
+        self.cache_tags = {}
@@ -17,10 +17,125 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 import functools
 import hashlib
 import json
-from typing import Any, Callable
-
+import threading
+import traceback
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .event import Event, get_event_dispatcher
+from .http import NotModified
 from .kv import KV
 
+MEMOIZE_REFRESHED_EVENT = "memoize-refreshed"
+
+
+class _MemoryCache:
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[float], int]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Any, Optional[float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None, None
+            value, expires_at, _ = entry
+            if expires_at is not None and expires_at <= datetime.now().timestamp():
+                self._remove(key)
+                return False, None, None
+            self._entries.move_to_end(key)
+            return True, value, expires_at
+
+    def put(self, key: str, value: Any, expires_at: Optional[float], size: int) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, expires_at, size)
+            self._size += size
+            self._evict()
+
+    def delete(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._remove(key)
+
+    def delete_partial(self, beginning: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(beginning)]:
+                self._remove(key)
+
+    def resize(self, max_bytes: int) -> None:
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self._size -= size
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes and self._entries:
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self._size -= size
+
+
+_MEMORY_CACHE = _MemoryCache(max_bytes=16777216)
+
+_IN_FLIGHT: Dict[str, Future] = {}
+_IN_FLIGHT_LOCK = threading.Lock()
+_REFRESHING: Set[str] = set()
+_REFRESH_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memoize-refresh")
+_CONTEXT = threading.local()
+_VALIDATORS_TTL_SECONDS = 604800
+
+# Invalidations are numbered. A result is only stored if none of its tags,
+# and no whole-cache clear, was invalidated after its computation started.
+_GENERATION_LOCK = threading.Lock()
+_GENERATION = 0
+_CLEARED_AT = 0
+_TAG_GENERATIONS: Dict[str, int] = {}
+
+
+def _bump_generation(tags: Iterable[str] = ()) -> None:
+    global _GENERATION, _CLEARED_AT
+    with _GENERATION_LOCK:
+        _GENERATION += 1
+        if tags:
+            for tag in tags:
+                _TAG_GENERATIONS[tag] = _GENERATION
+        else:
+            _CLEARED_AT = _GENERATION
+
+
+def set_memory_cache_size(max_bytes: int) -> None:
+    """
+    Set the memory budget of the in-process memoize cache.
+
+    Memoized results are kept in a bounded, least-recently-used cache in
+    front of the persistent KV store, so repeated calls return without
+    touching disk or parsing JSON. Entry sizes are estimated from their JSON
+    encoding. Results larger than the whole budget are only stored in KV.
+    Shrinking the budget evicts the least recently used entries right away.
+
+    Args:
+        max_bytes (int): Maximum estimated size of all cached results.
+            Defaults to 16 MiB. Use 0 to disable the in-memory tier.
+
+    Example:
+        >>> from src.ut_components.memoize import set_memory_cache_size
+        >>>
+        >>> # Allow up to 32 MiB of results in memory
+        >>> set_memory_cache_size(32 * 1024 * 1024)
+    """
+    _MEMORY_CACHE.resize(max_bytes)
+
 
 def hash_function_name(func: Callable) -> str:
     """
@@ -75,7 +190,291 @@ def hash_function_args(args, kwargs) -> str:
     return hashlib.sha1(f"{encoded_args}".encode()).hexdigest()
 
 
-def memoize(ttl_seconds: int):
+class _CallContext:
+    def __init__(self, previous_validators: Dict[str, str]) -> None:
+        self.tags: Set[str] = set()
+        self.previous_validators = previous_validators
+        self.validators: Dict[str, str] = {}
+        self.skip = False
+
+
+def _current_context() -> Optional[_CallContext]:
+    stack = getattr(_CONTEXT, "stack", None)
+    return stack[-1] if stack else None
+
+
+class _MemoizedCall:
+    def __init__(
+        self, key: str, ttl_seconds: int, stale_ttl: int, revalidate: bool, func: Callable, args, kwargs
+    ) -> None:
+        self.key = key
+        self.ttl_seconds = ttl_seconds
+        self.stale_ttl = stale_ttl
+        self.revalidate = revalidate
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.stored = False
+
+    def load(self) -> Any:
+        with KV() as kv:
+            response, expires_at, size = kv.get_entry(self.key)
+        if response is None:
+            return self.compute()
+        _MEMORY_CACHE.put(self.key, response, expires_at, size)
+        self.refresh_if_stale(expires_at)
+        return response
+
+    def compute(self) -> Any:
+        previous = None
+        if self.revalidate:
+            with KV() as kv:
+                previous = kv.get(f"{self.key}.validators")
+        context = _CallContext(previous["validators"] if previous else {})
+        with _GENERATION_LOCK:
+            started_at = _GENERATION
+        stack: List[_CallContext] = getattr(_CONTEXT, "stack", None) or []
+        _CONTEXT.stack = stack
+        stack.append(context)
+        try:
+            result = self.func(*self.args, **self.kwargs)
+            tags, validators, skip = context.tags, context.validators, context.skip
+        except NotModified:
+            if not previous:
+                raise
+            result, tags, validators = previous["result"], set(previous["tags"]), previous["validators"]
+            skip = False
+        finally:
+            stack.pop()
+        ttl_seconds = self.ttl_seconds + self.stale_ttl if self.ttl_seconds else 0
+        with _GENERATION_LOCK:
+            self.stored = (
+                not skip
+                and _CLEARED_AT <= started_at
+                and all(_TAG_GENERATIONS.get(tag, 0) <= started_at for tag in tags)
+            )
+            if not self.stored:
+                return result
+            with KV() as kv:
+                size = kv.put(self.key, result, ttl_seconds=ttl_seconds, tags=sorted(tags))
+                if validators:
+                    kv.put(
+                        f"{self.key}.validators",
+                        {"validators": validators, "result": result, "tags": sorted(tags)},
+                        ttl_seconds=_VALIDATORS_TTL_SECONDS,
+                        tags=sorted(tags),
+                    )
+            expires_at = (datetime.now() + timedelta(seconds=ttl_seconds)).timestamp() if ttl_seconds else None
+            _MEMORY_CACHE.put(self.key, result, expires_at, size)
+        return result
+
+    def refresh_if_stale(self, expires_at: Optional[float]) -> None:
+        if not self.stale_ttl or expires_at is None:
+            return
+        if expires_at - self.stale_ttl > datetime.now().timestamp():
+            return
+        with _IN_FLIGHT_LOCK:
+            if self.key in _REFRESHING:
+                return
+            _REFRESHING.add(self.key)
+        try:
+            _REFRESH_EXECUTOR.submit(self.refresh)
+        except BaseException:
+            with _IN_FLIGHT_LOCK:
+                _REFRESHING.discard(self.key)
+            raise
+
+    def refresh(self) -> None:
+        try:
+            with _IN_FLIGHT_LOCK:
+                if self.key in _IN_FLIGHT:
+                    return
+                _IN_FLIGHT[self.key] = future = Future()
+            try:
+                result = self.compute()
+                future.set_result(result)
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            finally:
+                with _IN_FLIGHT_LOCK:
+                    _IN_FLIGHT.pop(self.key, None)
+        except Exception as e:
+            get_event_dispatcher().schedule(
+                "error-event", metadata={"error": str(e), "traceback": traceback.format_exc()}
+            )
+            return
+        finally:
+            with _IN_FLIGHT_LOCK:
+                _REFRESHING.discard(self.key)
+        if self.stored:
+            get_event_dispatcher().schedule(
+                MEMOIZE_REFRESHED_EVENT,
+                metadata={
+                    "function": self.func.__name__,
+                    "args": list(self.args),
+                    "kwargs": self.kwargs,
+                    "result": result,
+                },
+            )
+
+
+class _RefreshEvent(Event):
+    def trigger(self, metadata: Dict) -> Dict:
+        return metadata
+
+
+get_event_dispatcher().register_event(_RefreshEvent(id=MEMOIZE_REFRESHED_EVENT))
+
+
+def tag_memoized(*tags: str) -> None:
+    """
+    Attach dependency tags to the memoized result being computed.
+
+    Call this from inside a memoized function to declare what its result
+    depends on, for example the album or the assets it lists. The tags
+    are stored with the cached result, and invalidate_tags() later removes
+    exactly the results that depend on something that changed. Calling it
+    outside a memoized function does nothing. Tags are only attached to
+    the innermost memoized call on the current thread.
+
+    Args:
+        *tags (str): Tags to attach, such as "album:123" or "asset:abc".
+
+    Example:
+        >>> from src.ut_components.memoize import memoize, tag_memoized
+        >>>
+        >>> @memoize(ttl_seconds=300)
+        >>> def album(album_id: str):
+        ...     assets = fetch_album_assets(album_id)
+        ...     tag_memoized(f"album:{album_id}", *[f"asset:{a}" for a in assets])
+        ...     return assets
+    """
+    context = _current_context()
+    if context:
+        context.tags.update(tags)
+
+
+def skip_memoized() -> None:
+    """
+    Return the memoized result being computed without caching it.
+
+    Call this from inside a memoized function when the result it is about
+    to return is incomplete, for example because some of the downloads it
+    waited on were cancelled. The caller still receives the result, but
+    nothing is written to the memory cache or the KV store, so the next
+    call computes it again. Calling it outside a memoized function does
+    nothing. Like tag_memoized(), it only affects the innermost memoized
+    call on the current thread.
+
+    Example:
+        >>> from src.ut_components.memoize import memoize, skip_memoized
+        >>>
+        >>> @memoize(ttl_seconds=300)
+        >>> def album_covers(album_ids):
+        ...     covers = [download_cover(a) for a in album_ids]
+        ...     if not all(covers):
+        ...         skip_memoized()
+        ...     return covers
+    """
+    context = _current_context()
+    if context:
+        context.skip = True
+
+
+def memoized_validator(name: str) -> Optional[str]:
+    """
+    Return the validator saved for a request by the previous run of the
+    memoized function being computed.
+
+    Memoized functions declared with revalidate=True keep the ETag or
+    Last-Modified of the requests they make, next to their last result.
+    When the function runs again, send the validator back as a conditional
+    request; if the server answers 304 Not Modified, let raise_for_status()
+    raise http.NotModified and the previous result is reused with a fresh
+    TTL, without transferring or parsing the body again.
+
+    Args:
+        name (str): Identifies the request inside the function, usually the
+            URL with its query string.
+
+    Returns:
+        Optional[str]: The saved validator, or None outside a revalidating
+            memoized call or when there is nothing saved yet.
+
+    Example:
+        >>> from src.ut_components import http
+        >>> from src.ut_components.memoize import memoize, memoized_validator, save_memoized_validator
+        >>>
+        >>> @memoize(ttl_seconds=300, revalidate=True)
+        >>> def albums():
+        ...     url = "https://photos.example.com/api/albums"
+        ...     response = http.get(url, validator=memoized_validator(url))
+        ...     response.raise_for_status()
+        ...     save_memoized_validator(url, response.validator)
+        ...     return response.json()
+    """
+    context = _current_context()
+    if context is None:
+        return None
+    return context.previous_validators.get(name)
+
+
+def save_memoized_validator(name: str, validator: Optional[str]) -> None:
+    """
+    Save the validator of a successful request made by the memoized function
+    being computed, so the next run can revalidate it.
+
+    Does nothing outside a memoized call or when validator is empty. See
+    memoized_validator() for the full flow.
+
+    Args:
+        name (str): Identifies the request inside the function.
+        validator (Optional[str]): The response ETag or Last-Modified value,
+            as returned by Response.validator.
+
+    Example:
+        >>> response = http.get(url, validator=memoized_validator(url))
+        >>> response.raise_for_status()
+        >>> save_memoized_validator(url, response.validator)
+    """
+    context = _current_context()
+    if context is not None and validator:
+        context.validators[name] = validator
+
+
+def invalidate_tags(*tags: str) -> List[str]:
+    """
+    Delete the cached entries that depend on any of the given tags.
+
+    Removes every memoized result tagged through tag_memoized(), from both
+    the KV store and the in-memory cache, along with any other KV entry
+    written with matching tags. Untagged and unrelated entries are kept,
+    so a small change does not throw away the whole cache the way
+    delete_all_memoized() does.
+
+    Args:
+        *tags (str): The tags to invalidate.
+
+    Returns:
+        List[str]: The KV keys that were deleted.
+
+    Example:
+        >>> from src.ut_components.memoize import invalidate_tags
+        >>>
+        >>> # An asset was removed from album 123
+        >>> invalidate_tags("album:123", "asset:abc")
+    """
+    if not tags:
+        return []
+    _bump_generation(tags)
+    with KV() as kv:
+        keys = kv.delete_tagged(tags)
+    _MEMORY_CACHE.delete(keys)
+    return keys
+
+
+def memoize(ttl_seconds: int, stale_ttl: int = 0, revalidate: bool = False):
     """
     Decorator factory for caching function results with time-to-live (TTL).
 
@@ -87,10 +486,38 @@ def memoize(ttl_seconds: int):
 
     The decorator uses a key-value store to persist cache across application
     restarts and creates unique cache keys based on the function name and arguments.
+    Recently used results are also kept in a bounded in-memory LRU cache (see
+    set_memory_cache_size()), so hot entries skip SQLite and JSON decoding.
+    Concurrent calls that miss the cache for the same arguments are coalesced:
+    one caller runs the function and the others wait for its result (or
+    exception) instead of repeating the work.
+
+    With stale_ttl, results are kept for another stale_ttl seconds after they
+    expire. A call in that window returns the stale result immediately and
+    refreshes it on a small pool of background workers. Once the refresh
+    finishes, the new result is sent to QML through the EventDispatcher as a
+    "memoize-refreshed" event with the function name, args, kwargs and
+    result, so pages can update in place. Only one refresh per cache entry
+    runs at a time, and a failed refresh is reported as an error event while
+    the stale result keeps being served until the window ends.
+
+    A result whose computation overlapped invalidate_tags() for one of its
+    tags, delete_memoized() or delete_all_memoized() is returned to the
+    caller but not stored, so a slow call cannot put back data that was
+    invalidated while it ran.
 
     Args:
         ttl_seconds (int): Time-to-live for cached results in seconds. After this
             period, the cache expires and the function will be executed again.
+        stale_ttl (int): Seconds after ttl_seconds during which the expired
+            result is still served while it is refreshed in the background.
+            Defaults to 0, which disables stale-while-revalidate. Requires the
+            event dispatcher to be started to deliver refreshed results.
+        revalidate (bool): Keep the validators saved with
+            save_memoized_validator() and the last result for a week, so an
+            expired entry can be revalidated with a conditional request. If
+            the function raises http.NotModified, the previous result and
+            tags are stored again with a fresh TTL. Defaults to False.
 
     Returns:
         Callable: A decorator function that can be applied to any function.
@@ -99,6 +526,10 @@ def memoize(ttl_seconds: int):
         - Function arguments must be JSON-serializable for caching to work.
         - Cached results are stored in a persistent KV store.
         - Each unique combination of arguments creates a separate cache entry.
+        - Results served from memory are shared between callers; treat them
+          as read-only.
+        - Call tag_memoized() inside the function to tag its result, so
+          invalidate_tags() can drop it without clearing the whole cache.
 
     Example:
         >>> from src.ut_components.memoize import memoize
@@ -118,6 +549,17 @@ def memoize(ttl_seconds: int):
         >>>
         >>> # Different arguments create a new cache entry
         >>> result3 = expensive_api_call("user456", "/profile")
+        >>>
+        >>> # Fresh for 5 minutes, then served stale for up to a day while
+        >>> # refreshing in the background
+        >>> @memoize(ttl_seconds=300, stale_ttl=86400)
+        >>> def timeline(bucket: str):
+        ...     return fetch_timeline(bucket)
+        >>>
+        >>> # In QML, update the page when a refreshed result arrives:
+        >>> # python.setHandler("memoize-refreshed", function(event) {
+        >>> #     if (event.function === "timeline") { ... event.result ... }
+        >>> # })
     """
 
     def decorator(func: Callable) -> Callable:
@@ -125,17 +567,32 @@ def memoize(ttl_seconds: int):
         def wrapper(*args, **kwargs) -> Any:
             hashed_function_name = hash_function_name(func)
             hashed_encoded_args = hash_function_args(args, kwargs)
-            with KV() as kv:
-                response = kv.get(f"memoize.{hashed_function_name}.{hashed_encoded_args}")
-                if response is not None:
-                    return response
-                result = func(*args, **kwargs)
-                kv.put(
-                    f"memoize.{hashed_function_name}.{hashed_encoded_args}",
-                    result,
-                    ttl_seconds=ttl_seconds,
-                )
+            key = f"memoize.{hashed_function_name}.{hashed_encoded_args}"
+
+            call = _MemoizedCall(key, ttl_seconds, stale_ttl, revalidate, func, args, kwargs)
+
+            found, response, expires_at = _MEMORY_CACHE.get(key)
+            if found:
+                call.refresh_if_stale(expires_at)
+                return response
+
+            with _IN_FLIGHT_LOCK:
+                in_flight = _IN_FLIGHT.get(key)
+                if in_flight is None:
+                    _IN_FLIGHT[key] = future = Future()
+            if in_flight is not None:
+                return in_flight.result()
+
+            try:
+                result = call.load()
+                future.set_result(result)
                 return result
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            finally:
+                with _IN_FLIGHT_LOCK:
+                    _IN_FLIGHT.pop(key, None)
 
         return wrapper
 
@@ -177,8 +634,10 @@ def delete_memoized(function: Callable):
         >>> data3 = get_user_data("user123")  # Fetches from database
     """
     hashed_function_name = hash_function_name(function)
+    _bump_generation()
     with KV() as kv:
         kv.delete_partial(f"memoize.{hashed_function_name}")
+    _MEMORY_CACHE.delete_partial(f"memoize.{hashed_function_name}")
 
 
 def delete_all_memoized():
@@ -208,5 +667,7 @@ def delete_all_memoized():
         >>> # Next call will fetch from database again
         >>> data3 = get_user_data("user123")  # Fetches from database
     """
+    _bump_generation()
     with KV() as kv:
         kv.delete_partial("memoize")
+    _MEMORY_CACHE.delete_partial("memoize")
@@ -0,0 +1,282 @@
+"""
+Copyright (C) 2025  Brenno Flávio de Almeida
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; version 3.
+
+ut-components is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future
+from enum import IntEnum
+from typing import Callable, Dict, List, Optional, Tuple
+
+DOWNLOAD_SCHEDULER = None
+
+
+class Priority(IntEnum):
+    """
+    Priority lanes of the DownloadScheduler. Lower values run first.
+
+    Attributes:
+        PREVIEW: Full screen previews the user is waiting for.
+        VISIBLE: Thumbnails of the grid being shown.
+        PREFETCH: Work for screens the user may open next.
+    """
+
+    PREVIEW = 0
+    VISIBLE = 1
+    PREFETCH = 2
+
+
+class _Task:
+    def __init__(self, func: Callable, args: Tuple, host: str, priority: Priority, group: str, future: Future) -> None:
+        self.func = func
+        self.args = args
+        self.host = host
+        self.priority = priority
+        self.group = group
+        self.future = future
+
+
+class DownloadScheduler:
+    """
+    A process-wide, bounded pool of worker threads for network downloads.
+
+    Every page of the application shares the same workers instead of
+    building a ThreadPoolExecutor per call, so two screens loading at once
+    do not oversubscribe the server. Tasks are queued per host, and at most
+    max_per_host tasks for the same host run at a time. Within those limits
+    the task with the lowest Priority runs first, and tasks of the same
+    priority run in submission order. Worker threads are started on demand,
+    up to max_workers, and then kept for later tasks.
+
+    At most max_prefetch Priority.PREFETCH tasks run at a time, across all
+    hosts. That caps the bandwidth spent on speculative work, so the
+    workers stay free for what the user is looking at.
+
+    Tasks are tagged with a group, usually the screen they belong to, and
+    cancel_group() drops the queued tasks of a screen the user has left.
+    Tasks that already started are allowed to finish.
+
+    Note:
+        Do not instantiate DownloadScheduler directly. Use the
+        get_download_scheduler() function to obtain the global singleton.
+        Tasks must not wait for other tasks of the scheduler, or the
+        workers can end up all waiting on each other.
+
+    Example:
+        >>> from src.ut_components.scheduler import Priority, get_download_scheduler
+        >>>
+        >>> scheduler = get_download_scheduler()
+        >>> futures = [
+        ...     scheduler.submit(download_thumbnail, image_id, host="photos.example.com", group="album.1")
+        ...     for image_id in image_ids
+        ... ]
+        >>> paths = [future.result() for future in futures]
+        >>>
+        >>> # The user opened a photo: run its preview before any thumbnail
+        >>> preview = scheduler.submit(download_preview, image_id, priority=Priority.PREVIEW)
+        >>>
+        >>> # The user left the album
+        >>> scheduler.cancel_group("album.1")
+    """
+
+    def __init__(self, max_workers: int = 8, max_per_host: int = 6, max_prefetch: int = 2) -> None:
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
+        self.max_prefetch = max_prefetch
+        self._queues: Dict[str, List[Tuple[int, int, _Task]]] = {}
+        self._active: Dict[str, int] = {}
+        self._prefetching = 0
+        self._workers = 0
+        self._idle = 0
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def configure(
+        self,
+        max_workers: Optional[int] = None,
+        max_per_host: Optional[int] = None,
+        max_prefetch: Optional[int] = None,
+    ) -> None:
+        """
+        Change the concurrency limits. Only the arguments that are passed are
+        changed.
+
+        Lowering a limit does not interrupt running tasks; it applies as they
+        finish. Extra worker threads stay around but only max_workers of them
+        are ever started.
+
+        Args:
+            max_workers (Optional[int]): Maximum number of worker threads.
+                Defaults to 8.
+            max_per_host (Optional[int]): Maximum number of tasks running at
+                the same time for one host. Defaults to 6.
+            max_prefetch (Optional[int]): Maximum number of Priority.PREFETCH
+                tasks running at the same time. Defaults to 2.
+
+        Example:
+            >>> get_download_scheduler().configure(max_per_host=4, max_prefetch=1)
+        """
+        with self._condition:
+            if max_workers is not None:
+                self.max_workers = max_workers
+            if max_per_host is not None:
+                self.max_per_host = max_per_host
+            if max_prefetch is not None:
+                self.max_prefetch = max_prefetch
+            self._condition.notify_all()
+
+    def submit(
+        self,
+        func: Callable,
+        *args,
+        host: str = "",
+        priority: Priority = Priority.VISIBLE,
+        group: str = "",
+    ) -> Future:
+        """
+        Queue func(*args) and return a Future for its result.
+
+        Args:
+            func (Callable): The function to run on a worker thread.
+            *args: Positional arguments for func.
+            host (str): The host func talks to, used for the per-host limit.
+                Defaults to "", which is a host like any other.
+            priority (Priority): The lane of the task. Defaults to
+                Priority.VISIBLE.
+            group (str): A name for cancel_group(), such as the screen the
+                task belongs to. Defaults to "".
+
+        Returns:
+            Future: Holds the result or the exception of func. If the task
+                is cancelled before it runs, result() raises CancelledError.
+
+        Example:
+            >>> future = get_download_scheduler().submit(download_thumbnail, url, token, image_id, host=host)
+            >>> file_path = future.result()
+        """
+        future: Future = Future()
+        task = _Task(func, args, host, priority, group, future)
+        with self._condition:
+            heapq.heappush(self._queues.setdefault(host, []), (int(priority), next(self._sequence), task))
+            if self._idle == 0 and self._workers < self.max_workers:
+                self._workers += 1
+                threading.Thread(target=self._work, name=f"download-scheduler-{self._workers}", daemon=True).start()
+            else:
+                self._condition.notify()
+        return future
+
+    def cancel_group(self, group: str) -> int:
+        """
+        Cancel the queued tasks of a group.
+
+        Their futures are cancelled, so whoever waits on them gets a
+        CancelledError right away. Tasks that are already running are not
+        interrupted.
+
+        Args:
+            group (str): The group passed to submit().
+
+        Returns:
+            int: The number of tasks cancelled.
+
+        Example:
+            >>> cancelled = get_download_scheduler().cancel_group("album.1")
+        """
+        cancelled: List[Future] = []
+        with self._condition:
+            for host, queue in self._queues.items():
+                kept = []
+                for entry in queue:
+                    if entry[2].group == group:
+                        cancelled.append(entry[2].future)
+                    else:
+                        kept.append(entry)
+                if len(kept) != len(queue):
+                    heapq.heapify(kept)
+                    self._queues[host] = kept
+        return sum(1 for future in cancelled if future.cancel())
+
+    def pending(self) -> int:
+        """
+        Return the number of queued tasks that have not started yet.
+
+        Example:
+            >>> print(get_download_scheduler().pending())
+        """
+        with self._condition:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def _next_task(self) -> Optional[_Task]:
+        best: Optional[Tuple[int, int, _Task]] = None
+        for host, queue in self._queues.items():
+            while queue and queue[0][2].future.cancelled():
+                heapq.heappop(queue)
+            if not queue or self._active.get(host, 0) >= self.max_per_host:
+                continue
+            if queue[0][0] == Priority.PREFETCH and self._prefetching >= self.max_prefetch:
+                continue
+            if best is None or queue[0][:2] < best[:2]:
+                best = queue[0]
+        if best is None:
+            return None
+        task = heapq.heappop(self._queues[best[2].host])[2]
+        self._active[task.host] = self._active.get(task.host, 0) + 1
+        if task.priority == Priority.PREFETCH:
+            self._prefetching += 1
+        return task
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                task = self._next_task()
+                while task is None:
+                    self._idle += 1
+                    self._condition.wait()
+                    self._idle -= 1
+                    task = self._next_task()
+
+            try:
+                if task.future.set_running_or_notify_cancel():
+                    try:
+                        task.future.set_result(task.func(*task.args))
+                    except BaseException as e:
+                        task.future.set_exception(e)
+            finally:
+                with self._condition:
+                    self._active[task.host] -= 1
+                    if task.priority == Priority.PREFETCH:
+                        self._prefetching -= 1
+                    self._condition.notify_all()
+
+
+def get_download_scheduler() -> DownloadScheduler:
+    """
+    Get the global singleton DownloadScheduler instance.
+
+    Returns:
+        DownloadScheduler: The shared scheduler.
+
+    Example:
+        >>> from src.ut_components.scheduler import get_download_scheduler
+        >>>
+        >>> get_download_scheduler().configure(max_workers=8, max_per_host=4)
+    """
+    global DOWNLOAD_SCHEDULER
+    if DOWNLOAD_SCHEDULER:
+        return DOWNLOAD_SCHEDULER
+    else:
+        DOWNLOAD_SCHEDULER = DownloadScheduler()
+        return DOWNLOAD_SCHEDULER